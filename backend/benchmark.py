@@ -0,0 +1,262 @@
+"""Load-test and latency benchmark for the dashboard endpoints.
+
+Runs the API in-process against the simulation stubs (or against a live
+server with ``--url``), ramps the number of concurrent clients and records
+throughput and p50/p95/p99 latency per endpoint:
+
+    python benchmark.py run --output benchmarks/baseline.json
+    python benchmark.py run --compare benchmarks/baseline.json --threshold 0.2
+    python benchmark.py compare benchmarks/baseline.json benchmarks/current.json
+    python benchmark.py serialization --rows 10000
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from serialization import RowSerializer, iter_json_array
+from simulation import Simulation, percentile, random_walk_prices
+
+ENDPOINTS = ["/api/status", "/api/positions", "/api/logs", "/api/wallet", "/api/price"]
+DEFAULT_CONCURRENCY = [1, 8, 32, 64]
+
+
+async def measure_endpoint(client: httpx.AsyncClient, endpoint: str, concurrency: int, requests: int) -> Dict[str, Any]:
+    """Fire ``requests`` GETs at ``endpoint`` from ``concurrency`` concurrent clients"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.get(endpoint)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_seconds = time.perf_counter() - wall_start
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / wall_seconds if wall_seconds else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def run_suite(
+    client: httpx.AsyncClient,
+    endpoints: List[str],
+    concurrency_levels: List[int],
+    requests: int,
+    warmup: int = 20,
+) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for endpoint in endpoints:
+        await measure_endpoint(client, endpoint, 1, warmup)
+        results[endpoint] = {}
+        for concurrency in concurrency_levels:
+            results[endpoint][str(concurrency)] = await measure_endpoint(client, endpoint, concurrency, requests)
+    return results
+
+
+async def run_in_process(args) -> Dict[str, Dict[str, Any]]:
+    import server
+
+    prices = random_walk_prices(args.seed_cycles, seed=args.seed)
+    async with Simulation(
+        prices,
+        rpc_latency=args.upstream_latency / 1000,
+        price_latency=args.upstream_latency / 1000,
+        seed=args.seed,
+    ) as sim:
+        # Populate positions, logs and status so list endpoints return real rows
+        await sim.run()
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await run_suite(client, args.endpoints, args.concurrency, args.requests)
+
+
+async def run_remote(args) -> Dict[str, Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        return await run_suite(client, args.endpoints, args.concurrency, args.requests)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a description of every endpoint/concurrency level that regressed"""
+    regressions = []
+    for endpoint, levels in current["results"].items():
+        for concurrency, result in levels.items():
+            base = baseline["results"].get(endpoint, {}).get(concurrency)
+            if not base:
+                continue
+            label = f"{endpoint} @ {concurrency} clients"
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                if base[metric] and result[metric] > base[metric] * (1 + threshold):
+                    regressions.append(f"{label}: {metric} {base[metric]:.2f} -> {result[metric]:.2f}")
+            if result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"{label}: throughput_rps {base['throughput_rps']:.1f} -> {result['throughput_rps']:.1f}"
+                )
+            if result["errors"] > base["errors"]:
+                regressions.append(f"{label}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, Any]]):
+    print(f"{'endpoint':<16}{'clients':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for endpoint, levels in results.items():
+        for concurrency, r in levels.items():
+            print(
+                f"{endpoint:<16}{concurrency:>8}{r['throughput_rps']:>10.1f}"
+                f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}"
+            )
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def report_regressions(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> int:
+    regressions = compare_results(baseline, current, threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:.0%}")
+    return 0
+
+
+def legacy_serialize(docs: List[Dict[str, Any]], model, adapter: TypeAdapter) -> bytes:
+    """The pre-streaming path: a model per row, response_model validation, then JSONResponse encoding"""
+    rows = [model(**doc) for doc in docs]
+    content = adapter.dump_python(adapter.validate_python(rows), mode="json")
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+async def fast_serialize(docs: List[Dict[str, Any]], serializer: RowSerializer) -> bytes:
+    return b"".join([chunk async for chunk in iter_json_array(docs, serializer)])
+
+
+def sample_documents(rows: int) -> Dict[str, List[Dict[str, Any]]]:
+    import server
+
+    now = datetime.now(timezone.utc)
+    positions = [
+        server.LiquidityPosition(
+            position_id=f"pos_{i}", pool_id="bench", lower_price=145.0, upper_price=155.0,
+            sol_amount=1.5, usdc_amount=220.0, liquidity_amount=445.0, status="closed", closed_at=now,
+        ).dict()
+        for i in range(rows)
+    ]
+    logs = [
+        server.BotLog(level="INFO", message=f"Checked at ${150 + i % 10:.2f}", details={"cycle": i}).dict()
+        for i in range(rows)
+    ]
+    return {"LiquidityPosition": positions, "BotLog": logs}
+
+
+def run_serialization(rows: int, repeats: int) -> Dict[str, Dict[str, float]]:
+    import server
+
+    models = {"LiquidityPosition": server.LiquidityPosition, "BotLog": server.BotLog}
+    results = {}
+    for name, docs in sample_documents(rows).items():
+        model = models[name]
+        serializer = RowSerializer(model)
+        response_adapter = TypeAdapter(List[model])
+        timings = {"legacy": [], "fast": []}
+        for _ in range(repeats):
+            start = time.perf_counter()
+            legacy_serialize([dict(doc) for doc in docs], model, response_adapter)
+            timings["legacy"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            asyncio.run(fast_serialize([dict(doc) for doc in docs], serializer))
+            timings["fast"].append((time.perf_counter() - start) * 1000)
+        legacy_ms, fast_ms = min(timings["legacy"]), min(timings["fast"])
+        results[name] = {"rows": rows, "legacy_ms": legacy_ms, "fast_ms": fast_ms, "speedup": legacy_ms / fast_ms}
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the /api dashboard endpoints")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark and optionally compare with a baseline")
+    run.add_argument("--url", help="Benchmark a running server instead of the in-process stubs")
+    run.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    run.add_argument("--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY)
+    run.add_argument("--requests", type=int, default=500, help="Requests per endpoint per concurrency level")
+    run.add_argument("--upstream-latency", type=float, default=0.0, help="Stub RPC/price latency in ms")
+    run.add_argument("--seed-cycles", type=int, default=288, help="Simulated bot cycles used to seed data")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--output", help="Write results as a JSON baseline")
+    run.add_argument("--compare", help="Baseline JSON to compare against")
+    run.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+
+    compare = commands.add_parser("compare", help="Compare two stored result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.2)
+
+    serialization = commands.add_parser("serialization", help="Compare the legacy and streaming list serializers")
+    serialization.add_argument("--rows", type=int, default=10000)
+    serialization.add_argument("--repeats", type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serialization":
+        for name, r in run_serialization(args.rows, args.repeats).items():
+            print(f"{name:<18} {r['rows']} rows: legacy {r['legacy_ms']:.1f} ms, fast {r['fast_ms']:.1f} ms ({r['speedup']:.1f}x)")
+        return 0
+
+    if args.command == "compare":
+        return report_regressions(load_results(args.baseline), load_results(args.current), args.threshold)
+
+    results = asyncio.run(run_remote(args) if args.url else run_in_process(args))
+    document = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "target": args.url or "in-process",
+            "requests": args.requests,
+            "upstream_latency_ms": args.upstream_latency,
+        },
+        "results": results,
+    }
+    print_results(results)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    if args.compare:
+        return report_regressions(load_results(args.compare), document, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
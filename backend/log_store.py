@@ -0,0 +1,138 @@
+"""Bounded storage for bot logs.
+
+``RecentLogBuffer`` keeps the newest logs in memory so ``/api/logs`` can be
+answered without a Mongo query, and ``compact_logs`` folds logs older than
+the retention window into one summary document per hour, so ``bot_logs``
+stays bounded over months of operation.
+"""
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_ERROR_SAMPLES = 5
+
+
+class RecentLogBuffer:
+    """Ring buffer of the last ``capacity`` log documents, oldest first.
+
+    The buffer only answers a query when it is guaranteed to hold the same
+    rows Mongo would return: it must have been primed with the newest logs,
+    and a filtered query must either find enough matches or the buffer must
+    still hold every log ever written.
+    """
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._entries = deque(maxlen=capacity)
+        self.primed = False
+        # True while nothing was ever evicted, i.e. the buffer holds all logs
+        self.complete = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, doc: Dict[str, Any]):
+        if len(self._entries) == self.capacity:
+            self.complete = False
+        self._entries.append(doc)
+
+    def prime(self, newest_first: Iterable[Dict[str, Any]]):
+        """Seed the buffer with the newest logs from Mongo, keeping anything
+        appended while the query was in flight"""
+        appended = list(self._entries)
+        seen = {doc["id"] for doc in appended}
+        history = [doc for doc in newest_first if doc["id"] not in seen]
+        self._entries.clear()
+        for doc in reversed(history[:max(0, self.capacity - len(appended))]):
+            self._entries.append(doc)
+        self.complete = len(history) + len(appended) <= self.capacity
+        for doc in appended:
+            self.append(doc)
+        self.primed = True
+
+    def recent(self, level: Optional[str] = None, limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """Newest-first logs, or None when the answer needs Mongo"""
+        if not self.primed or limit > self.capacity:
+            return None
+        rows = []
+        for doc in reversed(self._entries):
+            if level and doc["level"] != level:
+                continue
+            rows.append(doc)
+            if len(rows) == limit:
+                return rows
+        return rows if self.complete else None
+
+
+def _hour(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+async def ensure_indexes(db):
+    await db.bot_logs.create_index("timestamp")
+    await db.bot_log_summaries.create_index("hour", unique=True)
+
+
+async def compact_logs(db, retention_days: float, summary_retention_days: float, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Summarize whole hours of logs older than the retention window and delete them"""
+    now = now or datetime.now(timezone.utc)
+    # Align to the hour so every summarized hour is complete
+    cutoff = _hour(now - timedelta(days=retention_days)).replace(tzinfo=None)
+    summaries: Dict[datetime, Dict[str, Any]] = {}
+
+    cursor = db.bot_logs.find({"timestamp": {"$lt": cutoff}}, {"_id": 0, "level": 1, "message": 1, "timestamp": 1})
+    async for doc in cursor:
+        timestamp = doc["timestamp"].replace(tzinfo=None)
+        summary = summaries.setdefault(_hour(timestamp), {
+            "count": 0, "levels": {}, "first": timestamp, "last": timestamp, "errors": [],
+        })
+        summary["count"] += 1
+        summary["levels"][doc["level"]] = summary["levels"].get(doc["level"], 0) + 1
+        summary["first"] = min(summary["first"], timestamp)
+        summary["last"] = max(summary["last"], timestamp)
+        if doc["level"] == "ERROR":
+            summary["errors"] = (summary["errors"] + [doc["message"]])[-SUMMARY_ERROR_SAMPLES:]
+
+    logs_deleted = 0
+    for hour, summary in sorted(summaries.items()):
+        # Each hour is complete, so its totals are set rather than added: a
+        # run that dies before the delete is simply repeated by the next one
+        await db.bot_log_summaries.update_one(
+            {"hour": hour},
+            {"$set": {
+                "count": summary["count"],
+                "levels": summary["levels"],
+                "first_timestamp": summary["first"],
+                "last_timestamp": summary["last"],
+                "errors": summary["errors"],
+            }},
+            upsert=True,
+        )
+        deleted = await db.bot_logs.delete_many({"timestamp": {"$gte": hour, "$lt": hour + timedelta(hours=1)}})
+        logs_deleted += deleted.deleted_count
+
+    summary_cutoff = (now - timedelta(days=summary_retention_days)).replace(tzinfo=None)
+    expired = await db.bot_log_summaries.delete_many({"hour": {"$lt": summary_cutoff}})
+    return {
+        "hours_summarized": len(summaries),
+        "logs_deleted": logs_deleted,
+        "summaries_deleted": expired.deleted_count,
+    }
+
+
+async def run_compaction(get_db: Callable[[], Any], interval: float, retention_days: float, summary_retention_days: float):
+    """Compact forever; ``get_db`` is called each round so clients stay lazy"""
+    while True:
+        try:
+            result = await compact_logs(get_db(), retention_days, summary_retention_days)
+            if result["logs_deleted"] or result["summaries_deleted"]:
+                logger.info(f"Log compaction: {result}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error compacting logs: {e}")
+        await asyncio.sleep(interval)
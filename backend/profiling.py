@@ -0,0 +1,306 @@
+"""On-demand profiling of the bot loop and request handlers.
+
+``Profiler`` runs one bounded session at a time, either over a time window
+or over the next N bot cycles:
+
+* ``sample`` - a background thread snapshots the event-loop thread's stack
+  every few milliseconds, like py-spy but in-process. Time the loop spends
+  idle in the selector is not counted.
+* ``cprofile`` - deterministic cProfile. cProfile only records caller/callee
+  pairs, so its stacks are two frames deep, weighted by own time in
+  microseconds.
+
+Both produce collapsed stacks (``frame;frame;frame count`` per line), which
+flamegraph.pl, inferno and speedscope read directly. ``LoopWatchdog`` logs
+the loop thread's stack whenever a callback blocks the event loop for too
+long.
+"""
+import asyncio
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 256
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def frame_stack(frame) -> List[str]:
+    """Root-first labels of ``frame`` and its callers"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _pstats_label(func) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-ins have no source location
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def cprofile_stacks(profile: cProfile.Profile) -> Counter:
+    """Caller;callee pairs weighted by the callee's own time in microseconds"""
+    stacks: Counter = Counter()
+    for func, (_, _, own_time, _, callers) in pstats.Stats(profile).stats.items():
+        label = _pstats_label(func)
+        if not callers:
+            stacks[label] += round(own_time * 1e6)
+        for caller, edge in callers.items():
+            stacks[f"{_pstats_label(caller)};{label}"] += round(edge[2] * 1e6)
+    return +stacks
+
+
+@dataclass
+class ProfileSession:
+    mode: str
+    seconds: float
+    cycles: Optional[int] = None
+    interval: float = 0.005
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    cycles_profiled: int = 0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    in_cycle: bool = False
+
+    @property
+    def running(self) -> bool:
+        return self.finished_at is None
+
+    def collapsed(self) -> str:
+        """Flamegraph input, heaviest stacks first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "state": "running" if self.running else "finished",
+            "seconds": self.seconds,
+            "cycles": self.cycles,
+            "cycles_profiled": self.cycles_profiled,
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class Profiler:
+    """Runs at most one profiling session and keeps the last one's result.
+
+    ``start`` and ``stop`` must be called on the event-loop thread, which is
+    the thread being profiled. A cProfile session over bot cycles also sees
+    whatever else the loop runs while a cycle is awaiting I/O.
+    """
+
+    def __init__(self, max_seconds: float = 300.0, max_cycles: int = 5):
+        self.max_seconds = max_seconds
+        self.max_cycles = max_cycles
+        self.session: Optional[ProfileSession] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._done = threading.Event()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def active(self) -> bool:
+        return self.session is not None and self.session.running
+
+    def start(
+        self,
+        mode: str = "sample",
+        seconds: Optional[float] = None,
+        cycles: Optional[int] = None,
+        interval_ms: float = 5.0,
+        cycle_seconds: float = 300.0,
+    ) -> ProfileSession:
+        """Profile for ``seconds`` (at most ``max_seconds``, default 30), or
+        over the next ``cycles`` bot cycles (at most ``max_cycles``).
+
+        Cycles run ``cycle_seconds`` apart, so a cycle session times out
+        after ``seconds`` if given, which must leave room for every cycle,
+        or else one interval after the cycles should have finished. Raises
+        ValueError for a window or cycle count outside those limits.
+        """
+        if self.active:
+            raise ProfilerBusy(f"Profiling session {self.session.id} is still running")
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if cycles is None:
+            seconds = 30.0 if seconds is None else seconds
+            if not 0 < seconds <= self.max_seconds:
+                raise ValueError(f"seconds must be between 0 and {self.max_seconds:g}, got {seconds:g}")
+        else:
+            if not 0 < cycles <= self.max_cycles:
+                raise ValueError(f"cycles must be between 1 and {self.max_cycles}, got {cycles}")
+            needed = cycles * cycle_seconds
+            if seconds is None:
+                seconds = needed + cycle_seconds
+            elif seconds < needed:
+                raise ValueError(
+                    f"{cycles} cycles {cycle_seconds:g}s apart need at least {needed:g}s, got seconds={seconds:g}"
+                )
+        loop = asyncio.get_running_loop()
+        session = ProfileSession(
+            mode=mode,
+            seconds=seconds,
+            cycles=cycles,
+            interval=max(interval_ms, 1.0) / 1000,
+        )
+        self.session = session
+        self._done = threading.Event()
+
+        if mode == "sample":
+            self._sampler = threading.Thread(
+                target=self._sample, args=(session, threading.get_ident(), self._done),
+                name="profiler-sampler", daemon=True,
+            )
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            if cycles is None:
+                self._profile.enable()
+
+        self._timer = loop.call_later(session.seconds, self.stop)
+        logger.info(f"Profiling session {session.id} started: {session.summary()}")
+        return session
+
+    def stop(self) -> Optional[ProfileSession]:
+        session = self.session
+        if session is None or not session.running:
+            return session
+        if self._timer:
+            self._timer.cancel()
+        self._done.set()
+        if self._sampler:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+        if self._profile:
+            self._profile.disable()
+            session.stacks = cprofile_stacks(self._profile)
+            self._profile = None
+        session.in_cycle = False
+        session.finished_at = datetime.now(timezone.utc)
+        logger.info(f"Profiling session {session.id} finished: {session.summary()}")
+        return session
+
+    def _sample(self, session: ProfileSession, thread_id: int, done: threading.Event):
+        while not done.wait(session.interval):
+            if session.cycles is not None and not session.in_cycle:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                return
+            if frame.f_code.co_filename.endswith("selectors.py"):
+                # The loop is idle, waiting for I/O
+                continue
+            session.stacks[";".join(frame_stack(frame))] += 1
+            session.samples += 1
+            del frame
+
+    def profile_cycles(self, func):
+        """Decorator for the bot cycle so ``cycles`` sessions can scope to it"""
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            session = self.session
+            if session is None or not session.running or session.cycles is None:
+                return await func(*args, **kwargs)
+            session.in_cycle = True
+            if self._profile:
+                self._profile.enable()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if self._profile:
+                    self._profile.disable()
+                session.in_cycle = False
+                session.cycles_profiled += 1
+                if session.cycles_profiled >= session.cycles:
+                    self.stop()
+
+        return wrapper
+
+
+class LoopWatchdog:
+    """Logs a warning with the loop thread's stack while the event loop is
+    blocked for longer than ``threshold_ms``.
+
+    A heartbeat callback on the loop records when it last ran; a watcher
+    thread checks it and captures the stack of whatever is holding the loop.
+    """
+
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.period = self.threshold / 2
+        self.blocks = 0
+        self._beat = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = threading.Event()
+        self._heartbeat()
+        self._thread = threading.Thread(
+            target=self._watch, args=(threading.get_ident(), self._stop),
+            name="loop-watchdog", daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._handle:
+            self._handle.cancel()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+        self._handle = self._loop.call_later(self.period, self._heartbeat)
+
+    def _watch(self, thread_id: int, stop: threading.Event):
+        reported_beat = None
+        while not stop.wait(self.period / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.period
+            # One warning per block: a new heartbeat re-arms it
+            if beat == reported_beat or blocked < self.threshold:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                return
+            stack = "".join(traceback.format_stack(frame))
+            del frame
+            self.blocks += 1
+            reported_beat = beat
+            logger.warning(f"Event loop blocked for more than {blocked * 1000:.0f} ms:\n{stack}")
@@ -0,0 +1,171 @@
+"""Swap-to-ratio planning for new positions.
+
+A concentrated-liquidity position needs SOL and USDC in a ratio set by the
+current price and the range bounds. The planner works out that ratio, quotes
+the swap that gets the wallet there through Jupiter, and returns one plan
+holding both the swap and the deposit amounts, so nothing is left idle.
+Quotes are cached per size bucket for a few seconds, since every cycle in a
+burst asks for almost the same swap.
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+DECIMALS = {SOL_MINT: 9, USDC_MINT: 6}
+
+
+class QuoteUnavailable(Exception):
+    pass
+
+
+def liquidity_per_unit(price: float, lower: float, upper: float) -> Tuple[float, float]:
+    """SOL and USDC needed per unit of liquidity for a [lower, upper] range"""
+    if price <= lower:
+        return 1 / math.sqrt(lower) - 1 / math.sqrt(upper), 0.0
+    if price >= upper:
+        return 0.0, math.sqrt(upper) - math.sqrt(lower)
+    return 1 / math.sqrt(price) - 1 / math.sqrt(upper), math.sqrt(price) - math.sqrt(lower)
+
+
+def target_amounts(total_value: float, price: float, lower: float, upper: float) -> Tuple[float, float]:
+    """Split ``total_value`` (in USDC) into the SOL/USDC amounts the range needs"""
+    sol_per_l, usdc_per_l = liquidity_per_unit(price, lower, upper)
+    liquidity = total_value / (sol_per_l * price + usdc_per_l)
+    return liquidity * sol_per_l, liquidity * usdc_per_l
+
+
+def deposit_amounts(sol: float, usdc: float, price: float, lower: float, upper: float) -> Tuple[float, float]:
+    """Largest deposit the given balances allow at the range's ratio"""
+    sol_per_l, usdc_per_l = liquidity_per_unit(price, lower, upper)
+    limits = []
+    if sol_per_l:
+        limits.append(sol / sol_per_l)
+    if usdc_per_l:
+        limits.append(usdc / usdc_per_l)
+    liquidity = min(limits)
+    return liquidity * sol_per_l, liquidity * usdc_per_l
+
+
+@dataclass
+class SwapQuote:
+    input_mint: str
+    output_mint: str
+    in_amount: float
+    out_amount: float
+    price_impact_pct: float
+    route: List[str] = field(default_factory=list)
+    cached: bool = False
+
+
+class JupiterQuoteClient:
+    """Jupiter v6 quote API client with a short-lived per-size-bucket cache"""
+
+    def __init__(
+        self,
+        http_client: Callable[[], httpx.AsyncClient],
+        base_url: str = "https://quote-api.jup.ag/v6",
+        slippage_bps: int = 50,
+        cache_ttl: float = 5.0,
+        bucket_width: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._http_client = http_client
+        self.base_url = base_url.rstrip("/")
+        self.slippage_bps = slippage_bps
+        self.cache_ttl = cache_ttl
+        self.bucket_width = bucket_width
+        self.clock = clock
+        self._cache: Dict[Tuple[str, str, int], Tuple[float, SwapQuote]] = {}
+
+    def _bucket(self, amount: float) -> int:
+        # Geometric buckets: amounts within bucket_width of each other share a quote
+        return math.floor(math.log(amount) / math.log1p(self.bucket_width))
+
+    async def quote(self, input_mint: str, output_mint: str, amount: float) -> SwapQuote:
+        key = (input_mint, output_mint, self._bucket(amount))
+        now = self.clock()
+        cached = self._cache.get(key)
+        if cached and cached[0] > now:
+            quote = cached[1]
+            # Same route and rate, rescaled to the requested size
+            return SwapQuote(
+                input_mint, output_mint, amount, quote.out_amount * amount / quote.in_amount,
+                quote.price_impact_pct, quote.route, cached=True,
+            )
+
+        params = {
+            "inputMint": input_mint,
+            "outputMint": output_mint,
+            "amount": int(amount * 10 ** DECIMALS[input_mint]),
+            "slippageBps": self.slippage_bps,
+        }
+        try:
+            response = await self._http_client().get(f"{self.base_url}/quote", params=params)
+            response.raise_for_status()
+            data = response.json()
+            quote = SwapQuote(
+                input_mint=input_mint,
+                output_mint=output_mint,
+                in_amount=int(data["inAmount"]) / 10 ** DECIMALS[input_mint],
+                out_amount=int(data["outAmount"]) / 10 ** DECIMALS[output_mint],
+                price_impact_pct=float(data.get("priceImpactPct") or 0),
+                route=[step["swapInfo"].get("label", "") for step in data.get("routePlan", [])],
+            )
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            raise QuoteUnavailable(f"Jupiter quote failed: {e}")
+
+        self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[key] = (now + self.cache_ttl, quote)
+        return quote
+
+
+@dataclass
+class RebalancePlan:
+    lower_price: float
+    upper_price: float
+    sol_amount: float
+    usdc_amount: float
+    swap: Optional[SwapQuote] = None
+    leftover_sol: float = 0.0
+    leftover_usdc: float = 0.0
+
+
+class RebalancePlanner:
+    def __init__(self, quote_client: JupiterQuoteClient, min_swap_value: float = 1.0):
+        # A zero minimum would quote zero-sized swaps, which Jupiter (and the
+        # size buckets) cannot price
+        if min_swap_value <= 0:
+            raise ValueError(f"min_swap_value must be positive, got {min_swap_value:g}")
+        self.quote_client = quote_client
+        self.min_swap_value = min_swap_value
+
+    async def plan(self, sol: float, usdc: float, price: float, lower: float, upper: float) -> RebalancePlan:
+        """Swap ``sol``/``usdc`` to the range's ratio and size the deposit.
+
+        Raises QuoteUnavailable if a swap is needed but cannot be quoted.
+        """
+        target_sol, _ = target_amounts(sol * price + usdc, price, lower, upper)
+        swap = None
+        if (sol - target_sol) * price > self.min_swap_value:
+            swap = await self.quote_client.quote(SOL_MINT, USDC_MINT, sol - target_sol)
+            sol, usdc = sol - swap.in_amount, usdc + swap.out_amount
+        elif (target_sol - sol) * price > self.min_swap_value:
+            # Buying SOL: spend the USDC value of the shortfall
+            swap = await self.quote_client.quote(USDC_MINT, SOL_MINT, (target_sol - sol) * price)
+            sol, usdc = sol + swap.out_amount, usdc - swap.in_amount
+
+        sol_amount, usdc_amount = deposit_amounts(sol, usdc, price, lower, upper)
+        return RebalancePlan(
+            lower_price=lower,
+            upper_price=upper,
+            sol_amount=sol_amount,
+            usdc_amount=usdc_amount,
+            swap=swap,
+            leftover_sol=sol - sol_amount,
+            leftover_usdc=usdc - usdc_amount,
+        )
@@ -0,0 +1,187 @@
+"""Monte Carlo range selection.
+
+Simulates price paths over the next few hours - geometric Brownian motion,
+or bootstrapped from recorded bot-cycle prices when there is enough
+history - and estimates, for each candidate range, how long a position
+would stay in range before the bot closes it, how likely it is to go out of
+range, and the fees it would earn. Paths are advanced one step at a time
+over all paths and candidates at once, so memory stays at O(paths x
+candidates) and 100k paths take a fraction of a second.
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+HOURS_PER_YEAR = 24 * 365
+MIN_BOOTSTRAP_SAMPLES = 30
+# Returns spanning a gap this many times the median spacing (bot downtime)
+# are dropped rather than treated as a single step
+MAX_GAP_RATIO = 3.0
+
+
+@dataclass
+class RangeEstimate:
+    range_percent: float
+    lower_price: float
+    upper_price: float
+    expected_hours_in_range: float
+    out_of_range_probability: float
+    expected_fees: float
+    score: float
+
+
+def check_range_percent(range_percent: float):
+    # 200% puts the lower bound at zero; beyond it the bound goes negative
+    if not 0 < range_percent < 200:
+        raise ValueError(f"Range percent must be between 0 and 200 (exclusive), got {range_percent:g}")
+
+
+def parse_range_candidates(value: str) -> List[float]:
+    """Comma-separated range percents, e.g. RISK_RANGE_CANDIDATES="2,5,10" """
+    try:
+        percents = [float(c) for c in value.split(",") if c.strip()]
+    except ValueError:
+        raise ValueError(f"Range candidates must be comma-separated numbers, got '{value}'")
+    for range_percent in percents:
+        check_range_percent(range_percent)
+    return percents
+
+
+def range_bounds(current_price: float, range_percent: float):
+    """Same ±range/2 bounds LiquidityManager.create_position uses"""
+    half_width = range_percent / 100 / 2
+    return current_price * (1 - half_width), current_price * (1 + half_width)
+
+
+def capital_efficiency(range_percent: float) -> float:
+    """Liquidity per unit of capital relative to a full-range position"""
+    lower, upper = range_bounds(1.0, range_percent)
+    return 1 / (1 - (lower / upper) ** 0.25)
+
+
+def log_returns(prices: Sequence[float]) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    prices = prices[prices > 0]
+    return np.diff(np.log(prices)) if len(prices) > 1 else np.empty(0)
+
+
+def gbm_sampler(volatility: float, step_hours: float, drift: float = 0.0) -> Callable:
+    """Log-price increments for annualized ``volatility`` and ``drift``"""
+    dt = step_hours / HOURS_PER_YEAR
+    mean = np.float32((drift - 0.5 * volatility ** 2) * dt)
+    scale = np.float32(volatility * math.sqrt(dt))
+
+    def sample(rng: np.random.Generator, size: int) -> np.ndarray:
+        increments = rng.standard_normal(size, dtype=np.float32)
+        increments *= scale
+        increments += mean
+        return increments
+
+    return sample
+
+
+def bootstrap_sampler(returns: np.ndarray, history_step_seconds: float, step_hours: float) -> Optional[Callable]:
+    """Resample recorded returns, summed into non-overlapping blocks that
+    span one simulation step; None if there is too little history"""
+    per_step = max(1, round(step_hours * 3600 / history_step_seconds))
+    blocks = len(returns) // per_step
+    if blocks < MIN_BOOTSTRAP_SAMPLES:
+        return None
+    block_returns = returns[:blocks * per_step].reshape(blocks, per_step).sum(axis=1).astype(np.float32)
+
+    def sample(rng: np.random.Generator, size: int) -> np.ndarray:
+        return block_returns[rng.integers(0, blocks, size)]
+
+    return sample
+
+
+def make_sampler(prices: Sequence[float], timestamps: Sequence[datetime], step_hours: float, default_volatility: float) -> Callable:
+    """Bootstrap from recorded prices when there is enough history, else GBM
+    with the realized volatility (or ``default_volatility`` if too short).
+    Returns across gaps longer than ``MAX_GAP_RATIO`` median steps are dropped."""
+    if len(timestamps) != len(prices):
+        return gbm_sampler(default_volatility, step_hours)
+    prices = np.asarray(prices, dtype=np.float64)
+    seconds = np.array([t.timestamp() for t in timestamps], dtype=np.float64)
+    valid = prices > 0
+    returns = log_returns(prices[valid])
+    if len(returns):
+        gaps = np.diff(seconds[valid])
+        history_step_seconds = float(np.median(gaps))
+        if history_step_seconds > 0:
+            returns = returns[gaps <= MAX_GAP_RATIO * history_step_seconds]
+            sampler = bootstrap_sampler(returns, history_step_seconds, step_hours)
+            if sampler is not None:
+                return sampler
+            if len(returns) >= MIN_BOOTSTRAP_SAMPLES:
+                annualized = float(np.std(returns)) * math.sqrt(HOURS_PER_YEAR * 3600 / history_step_seconds)
+                return gbm_sampler(annualized, step_hours)
+    return gbm_sampler(default_volatility, step_hours)
+
+
+def evaluate_ranges(
+    current_price: float,
+    range_percents: Sequence[float],
+    capital: float,
+    sampler: Callable,
+    horizon_hours: float = 24.0,
+    steps_per_hour: int = 4,
+    n_paths: int = 100_000,
+    reference_range_percent: float = 5.0,
+    reference_fee_apr: float = 0.5,
+    rebalance_cost: float = 0.0,
+    seed: Optional[int] = None,
+) -> List[RangeEstimate]:
+    """Estimate time-in-range, out-of-range probability and fees per range.
+
+    A position earns fees until the first step the price leaves its range,
+    since the bot closes it then. Fee yield while in range is
+    ``reference_fee_apr`` (the APR observed for a ``reference_range_percent``
+    position) scaled by relative capital efficiency. ``score`` is expected
+    fees minus the expected cost of the rebalance an exit triggers.
+    """
+    for range_percent in range_percents:
+        check_range_percent(range_percent)
+    rng = np.random.default_rng(seed)
+    steps = max(1, int(round(horizon_hours * steps_per_hour)))
+    step_hours = horizon_hours / steps
+    percents = np.asarray(range_percents, dtype=np.float64)
+
+    half_widths = percents / 100 / 2
+    lower = np.log1p(-half_widths).astype(np.float32)[:, None]
+    upper = np.log1p(half_widths).astype(np.float32)[:, None]
+
+    log_price = np.zeros(n_paths, dtype=np.float32)
+    alive = np.ones((len(percents), n_paths), dtype=bool)
+    steps_in_range = np.zeros(len(percents), dtype=np.int64)
+    for _ in range(steps):
+        log_price += sampler(rng, n_paths)
+        alive &= (log_price >= lower) & (log_price <= upper)
+        steps_in_range += np.count_nonzero(alive, axis=1)
+
+    expected_hours = steps_in_range / n_paths * step_hours
+    out_of_range = 1 - np.count_nonzero(alive, axis=1) / n_paths
+
+    reference_efficiency = capital_efficiency(reference_range_percent)
+    estimates = []
+    for i, range_percent in enumerate(percents.tolist()):
+        fee_apr = reference_fee_apr * capital_efficiency(range_percent) / reference_efficiency
+        expected_fees = capital * fee_apr * expected_hours[i] / HOURS_PER_YEAR
+        lower_price, upper_price = range_bounds(current_price, range_percent)
+        estimates.append(RangeEstimate(
+            range_percent=range_percent,
+            lower_price=lower_price,
+            upper_price=upper_price,
+            expected_hours_in_range=float(expected_hours[i]),
+            out_of_range_probability=float(out_of_range[i]),
+            expected_fees=float(expected_fees),
+            score=float(expected_fees - out_of_range[i] * rebalance_cost),
+        ))
+    return estimates
+
+
+def best_range(estimates: List[RangeEstimate]) -> RangeEstimate:
+    return max(estimates, key=lambda estimate: estimate.score)
@@ -0,0 +1,97 @@
+"""Fast serialization path for the list endpoints.
+
+Mongo documents are validated once through a precompiled TypeAdapter (which
+fills defaults and coerces types) and written straight to JSON with orjson,
+instead of building a model per row and letting FastAPI validate and encode
+every row again through ``response_model``. Rows are streamed in chunks as
+either a JSON array or NDJSON, so large result sets never sit in memory as
+one response body.
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Type, Union
+
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+Rows = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
+
+class RowSerializer:
+    """Validate-once, orjson-encode serializer for flat pydantic models"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.adapter = TypeAdapter(model)
+
+    def dumps(self, doc: Dict[str, Any]) -> bytes:
+        doc.pop("_id", None)
+        row = self.adapter.validate_python(doc)
+        # Models served here only hold scalars, datetimes and plain dicts,
+        # which orjson encodes natively and in the same format as pydantic
+        return orjson.dumps(row.__dict__, option=orjson.OPT_UTC_Z)
+
+
+async def _iterate(rows: Rows) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+async def iter_json_array(rows: Rows, serializer: RowSerializer, first: Optional[Dict[str, Any]] = None) -> AsyncIterator[bytes]:
+    chunk = bytearray(b"[")
+    separator = b""
+    if first is not None:
+        chunk += serializer.dumps(first)
+        separator = b","
+    async for doc in _iterate(rows):
+        chunk += separator
+        chunk += serializer.dumps(doc)
+        separator = b","
+        if len(chunk) >= CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    chunk += b"]"
+    yield bytes(chunk)
+
+
+async def iter_ndjson(rows: Rows, serializer: RowSerializer, first: Optional[Dict[str, Any]] = None) -> AsyncIterator[bytes]:
+    chunk = bytearray()
+    if first is not None:
+        chunk += serializer.dumps(first) + b"\n"
+    async for doc in _iterate(rows):
+        chunk += serializer.dumps(doc)
+        chunk += b"\n"
+        if len(chunk) >= CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+async def stream_cursor(cursor, serializer: RowSerializer, fmt: str = "json") -> StreamingResponse:
+    """Stream a Motor cursor; the first row is fetched up front so query
+    errors still surface before the response has started"""
+    rows = cursor.__aiter__()
+    try:
+        first = await rows.__anext__()
+    except StopAsyncIteration:
+        first = None
+    return stream_rows(rows, serializer, fmt, first)
+
+
+def stream_rows(rows: Rows, serializer: RowSerializer, fmt: str = "json", first: Optional[Dict[str, Any]] = None) -> StreamingResponse:
+    if fmt == "ndjson":
+        body = iter_ndjson(rows, serializer, first)
+    else:
+        body = iter_json_array(rows, serializer, first)
+    return StreamingResponse(body, media_type=MEDIA_TYPES.get(fmt, MEDIA_TYPES["json"]))
@@ -1,15 +1,18 @@
-from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException
+from fastapi import FastAPI, APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import hmac
 import logging
 import asyncio
 import json
 import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone
 import httpx
@@ -17,7 +20,6 @@ import schedule
 from threading import Thread
 
 # Solana imports
-from solana.rpc.async_api import AsyncClient
 from solana.rpc.types import TxOpts
 from solana.rpc.commitment import Confirmed
 from solders.keypair import Keypair
@@ -25,24 +27,44 @@ from solders.pubkey import Pubkey
 from solders.transaction import VersionedTransaction
 import base58
 
+from rebalance import SOL_MINT, JupiterQuoteClient, QuoteUnavailable, RebalancePlanner
+from risk import best_range, evaluate_ranges, make_sampler, parse_range_candidates, range_bounds
+from log_store import RecentLogBuffer, ensure_indexes, run_compaction
+from profiling import LoopWatchdog, Profiler, ProfilerBusy
+from serialization import RowSerializer, stream_cursor, stream_rows
+from state_channel import DEFAULT_CHANNEL_NAME, SNAPSHOT_ROWS, StateChannel, StateChannelUnavailable
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-# Solana setup
-solana_client = AsyncClient(os.environ.get('SOLANA_RPC_URL', 'https://api.mainnet-beta.solana.com'))
-
 # Global variables for bot control
 bot_running = False
 bot_task = None
 
+# "embedded" runs the bot loop inside the API process, "worker" serves state
+# published by a separate worker.py process through shared memory
+BOT_MODE = os.environ.get('BOT_MODE', 'embedded')
+STATE_CHANNEL_NAME = os.environ.get('STATE_CHANNEL_NAME', DEFAULT_CHANNEL_NAME)
+state_channel: Optional[StateChannel] = None
+# Snapshots older than this many refresh intervals mean the worker is down
+STATE_STALE_AFTER_REFRESHES = 4
+log_compaction_task: Optional[asyncio.Task] = None
+loop_watchdog: Optional[LoopWatchdog] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients are created on first use; warm them up in the background so
+    # startup is not blocked by Mongo or the RPC node
+    global log_compaction_task, loop_watchdog
+    deps.start_warm_up()
+    loop_watchdog = start_loop_watchdog()
+    if BOT_MODE == "embedded":
+        log_compaction_task = start_log_compaction()
+    yield
+    await shutdown()
+
 # Create the main app without a prefix
-app = FastAPI(title="Solana Liquidity Management Bot")
+app = FastAPI(title="Solana Liquidity Management Bot", lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -92,6 +114,17 @@ class BotConfig(BaseModel):
     min_sol_amount: float = 0.01
     min_usdc_amount: float = 1.0
 
+# Precompiled serializers for the streaming list endpoints
+position_serializer = RowSerializer(LiquidityPosition)
+log_serializer = RowSerializer(BotLog)
+
+# Newest logs kept in memory so /api/logs rarely needs Mongo
+recent_logs = RecentLogBuffer(int(os.environ.get('LOG_BUFFER_SIZE', '500')))
+profiler = Profiler(
+    max_seconds=float(os.environ.get('PROFILE_MAX_SECONDS', '300')),
+    max_cycles=int(os.environ.get('PROFILE_MAX_CYCLES', '5')),
+)
+
 # Helper Functions
 class SolanaWalletManager:
     def __init__(self):
@@ -112,7 +145,7 @@ class SolanaWalletManager:
         if not self.public_key:
             return 0.0
         try:
-            response = await solana_client.get_balance(self.public_key)
+            response = await deps.solana_client.get_balance(self.public_key)
             return response.value / 1e9  # Convert lamports to SOL
         except Exception as e:
             logger.error(f"Error getting SOL balance: {e}")
@@ -131,30 +164,33 @@ class SolanaWalletManager:
             logger.error(f"Error getting USDC balance: {e}")
             return 0.0
 
-wallet_manager = SolanaWalletManager()
+MOCK_SOL_PRICE = 220.50
 
 class PriceMonitor:
     def __init__(self):
         # Using CoinGecko API as alternative
         self.coingecko_api = "https://api.coingecko.com/api/v3"
         
-    async def get_sol_price(self) -> float:
+    async def fetch_sol_price(self) -> Optional[float]:
+        """Live SOL price, or None if it could not be fetched"""
         try:
             # Try CoinGecko API first
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.coingecko_api}/simple/price?ids=solana&vs_currencies=usd")
-                if response.status_code == 200:
-                    data = response.json()
-                    return float(data['solana']['usd'])
-                
-                # Fallback to a mock price for testing
-                logger.warning("Could not fetch real SOL price, using mock price")
-                return 220.50  # Mock price for testing
+            response = await deps.http_client.get(f"{self.coingecko_api}/simple/price?ids=solana&vs_currencies=usd")
+            if response.status_code == 200:
+                data = response.json()
+                return float(data['solana']['usd'])
+            
+            logger.warning("Could not fetch real SOL price, using mock price")
+            return None
                 
         except Exception as e:
             logger.error(f"Error fetching SOL price: {e}")
-            # Return mock price for testing
-            return 220.50
+            return None
+
+    async def get_sol_price(self) -> float:
+        price = await self.fetch_sol_price()
+        # Fallback to a mock price for testing
+        return MOCK_SOL_PRICE if price is None else price
 
 price_monitor = PriceMonitor()
 
@@ -178,23 +214,37 @@ class DiscordNotifier:
             
             payload = {"embeds": [embed]}
             
-            async with httpx.AsyncClient() as client:
-                await client.post(self.webhook_url, json=payload)
+            await deps.http_client.post(self.webhook_url, json=payload)
                 
         except Exception as e:
             logger.error(f"Error sending Discord notification: {e}")
 
 discord_notifier = DiscordNotifier()
 
+class ConfigurationError(Exception):
+    pass
+
 class LiquidityManager:
     def __init__(self):
         self.pool_id = os.environ.get('SOL_USDC_POOL_ID', '8sLbNZoA1cfnvMJLPfp98ZLAnFSYCFApfJKMbiXNLwxj')
         self.price_range_percent = float(os.environ.get('PRICE_RANGE_PERCENT', '5.0'))
+        self._range_candidates: Optional[List[float]] = None
+
+    @property
+    def range_candidates(self) -> List[float]:
+        """RISK_RANGE_CANDIDATES, parsed on first use so a bad value shows up
+        in /api/health/ready instead of breaking the import"""
+        if self._range_candidates is None:
+            try:
+                self._range_candidates = parse_range_candidates(os.environ.get('RISK_RANGE_CANDIDATES', ''))
+            except ValueError as e:
+                raise ConfigurationError(f"Invalid RISK_RANGE_CANDIDATES: {e}")
+        return self._range_candidates
         
     async def get_current_positions(self) -> List[LiquidityPosition]:
         """Get active liquidity positions from database"""
         try:
-            positions = await db.liquidity_positions.find({"status": "active"}).to_list(100)
+            positions = await deps.db.liquidity_positions.find({"status": "active"}).to_list(100)
             return [LiquidityPosition(**pos) for pos in positions]
         except Exception as e:
             logger.error(f"Error getting positions: {e}")
@@ -204,11 +254,79 @@ class LiquidityManager:
         """Check if position is still in range"""
         return position.lower_price <= current_price <= position.upper_price
     
-    async def create_position(self, sol_amount: float, usdc_amount: float, current_price: float) -> Optional[str]:
+    async def choose_range(self, current_price: float, capital: float) -> float:
+        """Pick the range percent with the best Monte Carlo score among
+        RISK_RANGE_CANDIDATES, or PRICE_RANGE_PERCENT when none are configured"""
+        try:
+            if not self.range_candidates:
+                return self.price_range_percent
+            history_points = int(os.environ.get('RISK_HISTORY_POINTS', '2000'))
+            history = await deps.db.price_history.find({}, {"_id": 0}).sort("timestamp", -1).limit(history_points).to_list(history_points)
+            history.reverse()
+
+            horizon_hours = float(os.environ.get('RISK_HORIZON_HOURS', '24'))
+            steps_per_hour = int(os.environ.get('RISK_STEPS_PER_HOUR', '4'))
+            sampler = make_sampler(
+                [h["price"] for h in history],
+                [h["timestamp"] for h in history],
+                step_hours=1 / steps_per_hour,
+                default_volatility=float(os.environ.get('RISK_DEFAULT_VOLATILITY', '0.8')),
+            )
+            # NumPy releases the GIL, so this keeps the event loop responsive
+            estimates = await asyncio.to_thread(
+                evaluate_ranges,
+                current_price,
+                self.range_candidates,
+                capital,
+                sampler,
+                horizon_hours=horizon_hours,
+                steps_per_hour=steps_per_hour,
+                n_paths=int(os.environ.get('RISK_PATHS', '100000')),
+                reference_range_percent=self.price_range_percent,
+                reference_fee_apr=float(os.environ.get('RISK_REFERENCE_FEE_APR', '0.5')),
+                rebalance_cost=float(os.environ.get('RISK_REBALANCE_COST_USD', '1.0')),
+            )
+            best = best_range(estimates)
+            await self.log_action(
+                "INFO",
+                f"🎲 Chose {best.range_percent:g}% range: {best.expected_hours_in_range:.1f}h expected in range, "
+                f"{best.out_of_range_probability:.0%} out-of-range risk over {horizon_hours:g}h",
+                {"estimates": [asdict(e) for e in estimates]},
+            )
+            return best.range_percent
+        except Exception as e:
+            error_msg = f"Error evaluating ranges, using {self.price_range_percent}%: {e}"
+            logger.error(error_msg)
+            await self.log_action("WARNING", error_msg)
+            return self.price_range_percent
+
+    async def plan_rebalance(self, sol_amount: float, usdc_amount: float, current_price: float, range_percent: float):
+        """Swap the budget to the ratio the range needs; falls back to the
+        unswapped amounts when REBALANCE_TO_RATIO is off or no quote is available"""
+        if os.environ.get('REBALANCE_TO_RATIO', 'true').lower() != 'true':
+            return sol_amount, usdc_amount
+        lower_price, upper_price = range_bounds(current_price, range_percent)
+        try:
+            plan = await get_rebalance_planner().plan(sol_amount, usdc_amount, current_price, lower_price, upper_price)
+        except (QuoteUnavailable, ConfigurationError) as e:
+            await self.log_action("WARNING", f"Depositing without rebalancing: {e}")
+            return sol_amount, usdc_amount
+
+        if plan.swap:
+            swap = plan.swap
+            sold, bought = ("SOL", "USDC") if swap.input_mint == SOL_MINT else ("USDC", "SOL")
+            message = (
+                f"🔁 Swap {swap.in_amount:.4f} {sold} → {swap.out_amount:.4f} {bought} "
+                f"via {' → '.join(swap.route) or 'Jupiter'}{' (cached quote)' if swap.cached else ''}"
+            )
+            await self.log_action("INFO", message, asdict(plan))
+        return plan.sol_amount, plan.usdc_amount
+
+    async def create_position(self, sol_amount: float, usdc_amount: float, current_price: float, range_percent: Optional[float] = None) -> Optional[str]:
         """Create a new liquidity position - simplified simulation"""
         try:
             # Calculate price range (±2.5% for 5% total range)
-            range_multiplier = self.price_range_percent / 100 / 2
+            range_multiplier = (range_percent or self.price_range_percent) / 100 / 2
             lower_price = current_price * (1 - range_multiplier)
             upper_price = current_price * (1 + range_multiplier)
             
@@ -224,7 +342,7 @@ class LiquidityManager:
                 status="active"
             )
             
-            await db.liquidity_positions.insert_one(position.dict())
+            await deps.db.liquidity_positions.insert_one(position.dict())
             
             message = f"💰 New position created: {sol_amount:.4f} SOL + {usdc_amount:.2f} USDC at price ${current_price:.2f} (Range: ${lower_price:.2f} - ${upper_price:.2f})"
             await discord_notifier.send_notification(message)
@@ -242,7 +360,7 @@ class LiquidityManager:
         """Close a liquidity position"""
         try:
             # Update position status in database
-            await db.liquidity_positions.update_one(
+            await deps.db.liquidity_positions.update_one(
                 {"id": position.id},
                 {"$set": {"status": "closed", "closed_at": datetime.now(timezone.utc)}}
             )
@@ -263,25 +381,202 @@ class LiquidityManager:
         """Log bot action to database"""
         try:
             log_entry = BotLog(level=level, message=message, details=details)
-            await db.bot_logs.insert_one(log_entry.dict())
+            recent_logs.append(log_entry.dict())
+            await deps.db.bot_logs.insert_one(log_entry.dict())
         except Exception as e:
             logger.error(f"Error logging action: {e}")
 
 liquidity_manager = LiquidityManager()
 
+rebalance_planner: Optional[RebalancePlanner] = None
+
+def get_rebalance_planner() -> RebalancePlanner:
+    """Built on first use, so a bad MIN_SWAP_USD shows up in
+    /api/health/ready instead of breaking the import"""
+    global rebalance_planner
+    if rebalance_planner is None:
+        try:
+            rebalance_planner = RebalancePlanner(
+                JupiterQuoteClient(
+                    lambda: deps.http_client,
+                    base_url=os.environ.get('JUPITER_QUOTE_URL', 'https://quote-api.jup.ag/v6'),
+                    slippage_bps=int(os.environ.get('SWAP_SLIPPAGE_BPS', '50')),
+                    cache_ttl=float(os.environ.get('QUOTE_CACHE_TTL_SECONDS', '5')),
+                ),
+                min_swap_value=float(os.environ.get('MIN_SWAP_USD', '1.0')),
+            )
+        except ValueError as e:
+            raise ConfigurationError(f"Invalid rebalance settings: {e}")
+    return rebalance_planner
+
+class Dependencies:
+    """Mongo, Solana RPC and HTTP clients plus the wallet, created on first use.
+
+    Nothing here touches the network or the environment at import time, so
+    the strategy code can be imported by offline tools without live clients.
+    Pass instances as keyword arguments to override them (e.g. with fakes).
+    """
+
+    def __init__(self, db=None, solana_client=None, http_client=None, wallet_manager=None):
+        self._mongo_client = None
+        self._db = db
+        self._solana_client = solana_client
+        self._http_client = http_client
+        self._wallet_manager = wallet_manager
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self._recheck_after = 0.0
+        self.checks: Dict[str, str] = {}
+        self.ready = False
+
+    @property
+    def db(self):
+        if self._db is None:
+            mongo_url = os.environ.get('MONGO_URL')
+            db_name = os.environ.get('DB_NAME')
+            if not mongo_url or not db_name:
+                raise ConfigurationError("MONGO_URL and DB_NAME must be configured")
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self._mongo_client = AsyncIOMotorClient(mongo_url)
+            self._db = self._mongo_client[db_name]
+        return self._db
+
+    @property
+    def solana_client(self):
+        if self._solana_client is None:
+            from solana.rpc.async_api import AsyncClient
+            self._solana_client = AsyncClient(os.environ.get('SOLANA_RPC_URL', 'https://api.mainnet-beta.solana.com'))
+        return self._solana_client
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=float(os.environ.get('HTTP_TIMEOUT_SECONDS', '10')))
+        return self._http_client
+
+    @property
+    def wallet_manager(self) -> SolanaWalletManager:
+        if self._wallet_manager is None:
+            self._wallet_manager = SolanaWalletManager()
+        return self._wallet_manager
+
+    async def _check(self, name: str, probe):
+        try:
+            await probe()
+            self.checks[name] = "ok"
+        except Exception as e:
+            self.checks[name] = f"error: {e}"
+
+    async def _prepare_mongo(self):
+        await self.db.command("ping")
+        await ensure_indexes(self.db)
+        retention_days = float(os.environ.get('PRICE_HISTORY_RETENTION_DAYS', '30'))
+        await self.db.price_history.create_index("timestamp", expireAfterSeconds=int(retention_days * 86400))
+        if not recent_logs.primed:
+            newest = self.db.bot_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(recent_logs.capacity)
+            recent_logs.prime(await newest.to_list(recent_logs.capacity))
+
+    async def _check_config(self):
+        liquidity_manager.range_candidates
+        get_rebalance_planner()
+
+    async def _ping_mongo(self):
+        await self.db.command("ping")
+
+    async def _ping_rpc(self):
+        if not await self.solana_client.is_connected():
+            raise ConnectionError("RPC node unreachable")
+
+    async def _ping_state_channel(self):
+        state = get_worker_state()
+        # Only the worker loads the wallet key
+        self.checks["wallet"] = "configured" if state["wallet"]["configured"] else "not configured"
+
+    def _probes(self, clients: bool, prepare: bool) -> Dict[str, Any]:
+        if not clients:
+            return {"state_channel": self._ping_state_channel}
+        return {
+            "config": self._check_config,
+            "mongo": self._prepare_mongo if prepare else self._ping_mongo,
+            "solana_rpc": self._ping_rpc,
+        }
+
+    async def _run_probes(self, probes: Dict[str, Any]) -> bool:
+        await asyncio.gather(*(self._check(name, probe) for name, probe in probes.items()))
+        self.ready = all(self.checks[name] == "ok" for name in probes)
+        self._recheck_after = asyncio.get_running_loop().time() + float(os.environ.get('READY_CACHE_SECONDS', '2'))
+        return self.ready
+
+    async def warm_up(self, clients: Optional[bool] = None) -> bool:
+        """Create every client and probe its backend concurrently. API
+        processes in worker mode only need the state channel."""
+        if clients is None:
+            clients = BOT_MODE != "worker"
+        if clients:
+            self.checks["wallet"] = "configured" if self.wallet_manager.keypair else "not configured"
+            # Open the pooled HTTP client too, so the first price fetch doesn't pay for it
+            self.http_client
+        return await self._run_probes(self._probes(clients, prepare=True))
+
+    async def recheck(self) -> bool:
+        """Re-run the cheap pings once warmed up, so an outage after startup
+        is reported; results are reused for READY_CACHE_SECONDS"""
+        if asyncio.get_running_loop().time() < self._recheck_after:
+            return self.ready
+        return await self._run_probes(self._probes(BOT_MODE != "worker", prepare=False))
+
+    def start_warm_up(self) -> asyncio.Task:
+        if self._warm_up_task is None or (self._warm_up_task.done() and not self.ready):
+            self._warm_up_task = asyncio.create_task(self.warm_up())
+        return self._warm_up_task
+
+    async def close(self):
+        if self._warm_up_task and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+        if self._mongo_client is not None:
+            self._mongo_client.close()
+        if self._solana_client is not None:
+            await self._solana_client.close()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+deps = Dependencies()
+
+def start_log_compaction() -> asyncio.Task:
+    """Periodically fold logs past LOG_RETENTION_DAYS into hourly summaries"""
+    return asyncio.create_task(run_compaction(
+        lambda: deps.db,
+        interval=float(os.environ.get('LOG_COMPACTION_INTERVAL_SECONDS', '3600')),
+        retention_days=float(os.environ.get('LOG_RETENTION_DAYS', '7')),
+        summary_retention_days=float(os.environ.get('LOG_SUMMARY_RETENTION_DAYS', '365')),
+    ))
+
+def start_loop_watchdog() -> Optional[LoopWatchdog]:
+    """Warn with a stack trace when the event loop is blocked past LOOP_BLOCK_WARN_MS"""
+    threshold_ms = float(os.environ.get('LOOP_BLOCK_WARN_MS', '500'))
+    if threshold_ms <= 0:
+        return None
+    return LoopWatchdog(threshold_ms).start()
+
 # Bot Logic
-async def bot_cycle():
+@profiler.profile_cycles
+async def bot_cycle() -> Optional[BotStatus]:
     """Main bot logic - runs periodically"""
     try:
         # Get current price
-        current_price = await price_monitor.get_sol_price()
+        live_price = await price_monitor.fetch_sol_price()
+        current_price = MOCK_SOL_PRICE if live_price is None else live_price
         if current_price == 0:
             await liquidity_manager.log_action("ERROR", "Could not fetch SOL price")
-            return
+            return None
+        
+        # Record fetched prices for volatility estimates; the mock price
+        # would look like a jump to the risk model
+        if live_price is not None:
+            await deps.db.price_history.insert_one({"price": current_price, "timestamp": datetime.now(timezone.utc)})
         
         # Get wallet balances
-        sol_balance = await wallet_manager.get_sol_balance()
-        usdc_balance = await wallet_manager.get_usdc_balance()
+        sol_balance = await deps.wallet_manager.get_sol_balance()
+        usdc_balance = await deps.wallet_manager.get_usdc_balance()
         
         # Get current positions
         positions = await liquidity_manager.get_current_positions()
@@ -305,7 +600,9 @@ async def bot_cycle():
             # Use 80% of available balance for new position
             sol_to_use = sol_balance * 0.8
             usdc_to_use = usdc_balance * 0.8
-            await liquidity_manager.create_position(sol_to_use, usdc_to_use, current_price)
+            range_percent = await liquidity_manager.choose_range(current_price, sol_to_use * current_price + usdc_to_use)
+            sol_to_use, usdc_to_use = await liquidity_manager.plan_rebalance(sol_to_use, usdc_to_use, current_price, range_percent)
+            await liquidity_manager.create_position(sol_to_use, usdc_to_use, current_price, range_percent)
         
         # Update bot status
         status = BotStatus(
@@ -318,14 +615,16 @@ async def bot_cycle():
             sol_price=current_price
         )
         
-        await db.bot_status.replace_one({}, status.dict(), upsert=True)
+        await deps.db.bot_status.replace_one({}, status.dict(), upsert=True)
         
         logger.info(f"Bot cycle completed - Price: ${current_price:.2f}, SOL: {sol_balance:.4f}, Active positions: {active_positions}")
+        return status
         
     except Exception as e:
         error_msg = f"Error in bot cycle: {e}"
         logger.error(error_msg)
         await liquidity_manager.log_action("ERROR", error_msg)
+        return None
 
 async def run_bot():
     """Background task that runs the bot"""
@@ -336,15 +635,79 @@ async def run_bot():
         await bot_cycle()
         await asyncio.sleep(check_interval)
 
+def worker_channel(verify: bool = False) -> StateChannel:
+    """The worker's state channel, re-attached if the worker was restarted.
+    ``verify`` also catches a worker that died without closing its segment."""
+    global state_channel
+    try:
+        if state_channel is None:
+            state_channel = StateChannel.attach(STATE_CHANNEL_NAME)
+        elif verify or state_channel.retired:
+            state_channel = state_channel.reattach(STATE_CHANNEL_NAME)
+    except StateChannelUnavailable as e:
+        state_channel = None
+        raise HTTPException(status_code=503, detail=str(e))
+    return state_channel
+
+def read_worker_state(channel: StateChannel) -> Dict[str, Any]:
+    try:
+        state = channel.read()
+    except StateChannelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if state is None:
+        raise HTTPException(status_code=503, detail="Bot worker has not published any state yet")
+    return state
+
+def worker_state_age(state: Dict[str, Any]) -> float:
+    published_at = datetime.fromisoformat(state["worker"]["published_at"])
+    return (datetime.now(timezone.utc) - published_at).total_seconds()
+
+def get_worker_state() -> Dict[str, Any]:
+    """Latest snapshot published by the bot worker (worker mode only)"""
+    max_age = STATE_STALE_AFTER_REFRESHES * float(os.environ.get('STATE_REFRESH_SECONDS', '15'))
+    state = read_worker_state(worker_channel())
+    if worker_state_age(state) > max_age:
+        # A replacement worker publishes on a new segment
+        state = read_worker_state(worker_channel(verify=True))
+        age = worker_state_age(state)
+        if age > max_age:
+            raise HTTPException(status_code=503, detail=f"Bot worker state is stale: last published {age:.0f}s ago")
+    return state
+
+def snapshot_rows(rows: List[Dict[str, Any]], field: str, value: Optional[str], limit: int) -> Optional[List[Dict[str, Any]]]:
+    """Newest-first rows from a worker snapshot, or None when the answer needs
+    Mongo. The snapshot holds the newest SNAPSHOT_ROWS rows, so it can only
+    answer queries whose matches all fall within them."""
+    matches = [row for row in rows if not value or row[field] == value]
+    if len(matches) >= limit or len(rows) < SNAPSHOT_ROWS:
+        return matches[:limit]
+    return None
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "Solana Liquidity Management Bot API", "status": "running"}
 
+@api_router.get("/health/ready")
+async def readiness():
+    timeout = float(os.environ.get('READY_TIMEOUT_SECONDS', '5'))
+    try:
+        ready = await asyncio.wait_for(asyncio.shield(deps.start_warm_up()), timeout=timeout)
+        if ready:
+            # Warm-up stops once it succeeds; re-ping so a later outage (or a
+            # worker that stopped publishing) is reported
+            ready = await asyncio.wait_for(deps.recheck(), timeout=timeout)
+    except asyncio.TimeoutError:
+        ready = False
+    body = {"ready": ready, "mode": BOT_MODE, "checks": deps.checks}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
 @api_router.get("/status", response_model=BotStatus)
 async def get_bot_status():
+    if BOT_MODE == "worker":
+        return BotStatus(**get_worker_state()["status"])
     try:
-        status_doc = await db.bot_status.find_one({})
+        status_doc = await deps.db.bot_status.find_one({})
         if status_doc:
             return BotStatus(**status_doc)
         else:
@@ -357,11 +720,21 @@ async def get_bot_status():
 async def start_bot(background_tasks: BackgroundTasks):
     global bot_running, bot_task
     
+    if BOT_MODE == "worker":
+        state = get_worker_state()
+        if state["worker"]["is_running"] or worker_channel().running_requested():
+            return {"message": "Bot is already running"}
+        # Only the worker loads the wallet key; it reports whether it has one
+        if not state["wallet"]["configured"]:
+            raise HTTPException(status_code=400, detail="Wallet private key not configured")
+        worker_channel(verify=True).request_running(True)
+        return {"message": "Bot start requested"}
+    
     if bot_running:
         return {"message": "Bot is already running"}
     
     # Check if wallet is configured
-    if not wallet_manager.keypair:
+    if not deps.wallet_manager.keypair:
         raise HTTPException(status_code=400, detail="Wallet private key not configured")
     
     bot_running = True
@@ -376,6 +749,13 @@ async def start_bot(background_tasks: BackgroundTasks):
 async def stop_bot():
     global bot_running, bot_task
     
+    if BOT_MODE == "worker":
+        state = get_worker_state()
+        if not (state["worker"]["is_running"] or worker_channel().running_requested()):
+            return {"message": "Bot is not running"}
+        worker_channel(verify=True).request_running(False)
+        return {"message": "Bot stop requested"}
+    
     if not bot_running:
         return {"message": "Bot is not running"}
     
@@ -389,33 +769,58 @@ async def stop_bot():
     return {"message": "Bot stopped successfully"}
 
 @api_router.get("/positions", response_model=List[LiquidityPosition])
-async def get_positions(status: Optional[str] = None):
+async def get_positions(status: Optional[str] = None, limit: int = 100, format: Literal["json", "ndjson"] = "json"):
+    if BOT_MODE == "worker":
+        state = get_worker_state()
+        if status == "active":
+            positions = state["active_positions"][:limit]
+        else:
+            positions = snapshot_rows(state["positions"], "status", status, limit)
+        if positions is not None:
+            return stream_rows(positions, position_serializer, format)
     try:
         query = {}
         if status:
             query["status"] = status
         
-        positions = await db.liquidity_positions.find(query).sort("created_at", -1).to_list(100)
-        return [LiquidityPosition(**pos) for pos in positions]
+        cursor = deps.db.liquidity_positions.find(query, {"_id": 0}).sort("created_at", -1).limit(limit)
+        return await stream_cursor(cursor, position_serializer, format)
     except Exception as e:
         logger.error(f"Error getting positions: {e}")
         raise HTTPException(status_code=500, detail="Error getting positions")
 
 @api_router.get("/logs", response_model=List[BotLog])
-async def get_logs(level: Optional[str] = None, limit: int = 100):
+async def get_logs(level: Optional[str] = None, limit: int = 100, format: Literal["json", "ndjson"] = "json"):
+    if BOT_MODE == "worker":
+        logs = snapshot_rows(get_worker_state()["logs"], "level", level, limit)
+    else:
+        logs = recent_logs.recent(level, limit)
+    if logs is not None:
+        return stream_rows(logs, log_serializer, format)
     try:
         query = {}
         if level:
             query["level"] = level
         
-        logs = await db.bot_logs.find(query).sort("timestamp", -1).limit(limit).to_list(limit)
-        return [BotLog(**log) for log in logs]
+        cursor = deps.db.bot_logs.find(query, {"_id": 0}).sort("timestamp", -1).limit(limit)
+        return await stream_cursor(cursor, log_serializer, format)
     except Exception as e:
         logger.error(f"Error getting logs: {e}")
         raise HTTPException(status_code=500, detail="Error getting logs")
 
+@api_router.get("/logs/summaries")
+async def get_log_summaries(limit: int = 168):
+    """Hourly summaries of logs that were compacted out of bot_logs"""
+    try:
+        return await deps.db.bot_log_summaries.find({}, {"_id": 0}).sort("hour", -1).limit(limit).to_list(limit)
+    except Exception as e:
+        logger.error(f"Error getting log summaries: {e}")
+        raise HTTPException(status_code=500, detail="Error getting log summaries")
+
 @api_router.get("/price")
 async def get_current_price():
+    if BOT_MODE == "worker":
+        return get_worker_state()["price"]
     try:
         price = await price_monitor.get_sol_price()
         return {"sol_price": price, "timestamp": datetime.now(timezone.utc)}
@@ -425,15 +830,17 @@ async def get_current_price():
 
 @api_router.get("/wallet")
 async def get_wallet_info():
+    if BOT_MODE == "worker":
+        return get_worker_state()["wallet"]
     try:
-        sol_balance = await wallet_manager.get_sol_balance()
-        usdc_balance = await wallet_manager.get_usdc_balance()
+        sol_balance = await deps.wallet_manager.get_sol_balance()
+        usdc_balance = await deps.wallet_manager.get_usdc_balance()
         
         return {
-            "public_key": str(wallet_manager.public_key) if wallet_manager.public_key else None,
+            "public_key": str(deps.wallet_manager.public_key) if deps.wallet_manager.public_key else None,
             "sol_balance": sol_balance,
             "usdc_balance": usdc_balance,
-            "configured": wallet_manager.keypair is not None
+            "configured": deps.wallet_manager.keypair is not None
         }
     except Exception as e:
         logger.error(f"Error getting wallet info: {e}")
@@ -448,6 +855,61 @@ async def test_discord_notification():
         logger.error(f"Error sending test notification: {e}")
         raise HTTPException(status_code=500, detail="Error sending test notification")
 
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    admin_token = os.environ.get('ADMIN_TOKEN', '')
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@api_router.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def start_profile(
+    mode: Literal["sample", "cprofile"] = "sample",
+    seconds: Optional[float] = None,
+    cycles: Optional[int] = None,
+    interval_ms: float = 5.0,
+):
+    """Profile this process for ``seconds``, or over the next ``cycles`` bot
+    cycles; the summary reports the window the session actually uses"""
+    if cycles is not None and BOT_MODE == "worker":
+        raise HTTPException(status_code=409, detail="Bot cycles run in worker.py in worker mode")
+    try:
+        session = profiler.start(
+            mode, seconds, cycles, interval_ms,
+            cycle_seconds=float(os.environ.get('CHECK_INTERVAL_SECONDS', '300')),
+        )
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.summary()
+
+@api_router.post("/admin/profile/stop", dependencies=[Depends(require_admin)])
+async def stop_profile():
+    session = profiler.stop()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    return session.summary()
+
+@api_router.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def get_profile():
+    if profiler.session is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    return profiler.session.summary()
+
+@api_router.get("/admin/profile/stacks", dependencies=[Depends(require_admin)])
+async def get_profile_stacks():
+    """Collapsed stacks of the last finished session, for flamegraph.pl or speedscope"""
+    session = profiler.session
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    if session.running:
+        raise HTTPException(status_code=409, detail="Profiling session is still running")
+    return PlainTextResponse(
+        session.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{session.id}.folded"'},
+    )
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -459,11 +921,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
+async def shutdown():
     global bot_running, bot_task
     bot_running = False
     if bot_task:
         bot_task.cancel()
-    client.close()
-    await solana_client.close()
+    if log_compaction_task:
+        log_compaction_task.cancel()
+    if loop_watchdog:
+        loop_watchdog.stop()
+    profiler.stop()
+    if state_channel:
+        state_channel.close()
+    await deps.close()
@@ -0,0 +1,361 @@
+"""Deterministic offline simulation of the bot.
+
+Boots ``server.py`` against in-process fakes - a Solana RPC stub, a scripted
+price feed, an in-memory Mongo (mongomock, or a real mongod via
+``SIM_MONGO_URL``) and a Discord sink - and drives ``bot_cycle`` on a virtual
+clock, so market scenarios replay far faster than real time and without a
+network:
+
+    python simulation.py --scenario random_walk --cycles 1000 --seed 7
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+
+import server
+from log_store import RecentLogBuffer
+from rebalance import DECIMALS, SOL_MINT, JupiterQuoteClient, RebalancePlanner
+from solders.keypair import Keypair
+
+SIM_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class VirtualClock:
+    def __init__(self, start: datetime = SIM_START):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def time(self) -> float:
+        return self._now.timestamp()
+
+    def advance(self, seconds: float):
+        self._now += timedelta(seconds=seconds)
+
+    def datetime_class(self):
+        """A datetime subclass whose now() follows this clock"""
+        clock = self
+
+        class VirtualDateTime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                now = clock.now()
+                return now.astimezone(tz) if tz else now.replace(tzinfo=None)
+
+        return VirtualDateTime
+
+
+class ScriptedPriceFeed:
+    """Replays a fixed list of prices, one per bot cycle"""
+
+    def __init__(self, prices: List[float], latency: float = 0.0):
+        if not prices:
+            raise ValueError("A price script needs at least one price")
+        self.prices = list(prices)
+        self.latency = latency
+        self.index = 0
+        self.requests = 0
+
+    async def fetch_sol_price(self) -> float:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.prices[min(self.index, len(self.prices) - 1)]
+
+    async def get_sol_price(self) -> float:
+        return await self.fetch_sol_price()
+
+    def advance(self):
+        self.index += 1
+
+
+class StubRpcClient:
+    """In-process stand-in for solana.rpc.async_api.AsyncClient"""
+
+    def __init__(self, lamports: Dict[str, int], latency: float = 0.0):
+        self.lamports = lamports
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+
+    async def _call(self, method: str):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def is_connected(self) -> bool:
+        await self._call("getHealth")
+        return True
+
+    async def get_balance(self, pubkey, commitment=None):
+        await self._call("getBalance")
+        return SimpleNamespace(value=self.lamports.get(str(pubkey), 0))
+
+    async def close(self):
+        pass
+
+
+class SimulatedWallet(server.SolanaWalletManager):
+    """Wallet with a throwaway keypair and a scripted USDC balance"""
+
+    def __init__(self, usdc_balance: float, seed: int):
+        self.private_key = ''
+        self.keypair = Keypair.from_seed(random.Random(seed).randbytes(32))
+        self.public_key = self.keypair.pubkey()
+        self.usdc_balance = usdc_balance
+
+    async def get_usdc_balance(self) -> float:
+        return self.usdc_balance
+
+
+class StubJupiter:
+    """Local Jupiter quote server filling swaps at the scripted price, less
+    a fee and a linear price impact; serve it through ``transport``"""
+
+    def __init__(self, price_feed: ScriptedPriceFeed, fee_bps: float = 25, impact_bps_per_1k_usd: float = 1.0):
+        self.price_feed = price_feed
+        self.fee_bps = fee_bps
+        self.impact_bps_per_1k_usd = impact_bps_per_1k_usd
+        self.requests = 0
+        self.app = FastAPI()
+        self.app.get("/v6/quote")(self.quote)
+        self.transport = httpx.ASGITransport(app=self.app)
+
+    async def quote(self, inputMint: str, outputMint: str, amount: int, slippageBps: int = 50):
+        self.requests += 1
+        price = self.price_feed.prices[min(self.price_feed.index, len(self.price_feed.prices) - 1)]
+        in_amount = amount / 10 ** DECIMALS[inputMint]
+        usd_value = in_amount * price if inputMint == SOL_MINT else in_amount
+        impact = self.impact_bps_per_1k_usd * usd_value / 1000 / 10_000
+        out_amount = (in_amount * price if inputMint == SOL_MINT else in_amount / price)
+        out_amount *= 1 - self.fee_bps / 10_000 - impact
+        return {
+            "inputMint": inputMint,
+            "inAmount": str(amount),
+            "outputMint": outputMint,
+            "outAmount": str(int(out_amount * 10 ** DECIMALS[outputMint])),
+            "slippageBps": slippageBps,
+            "priceImpactPct": str(impact),
+            "routePlan": [{"swapInfo": {"label": "Raydium CLMM"}, "percent": 100}],
+        }
+
+
+class DiscordSink:
+    def __init__(self):
+        self.messages: List[Dict[str, str]] = []
+
+    async def send_notification(self, message: str, level: str = "INFO"):
+        self.messages.append({"level": level, "message": message})
+
+
+# Price scenarios
+def random_walk_prices(cycles: int, start: float = 150.0, volatility: float = 0.01, seed: int = 0) -> List[float]:
+    rng = random.Random(seed)
+    prices = [start]
+    for _ in range(cycles - 1):
+        prices.append(prices[-1] * math.exp(rng.gauss(0, volatility)))
+    return prices
+
+
+def trend_prices(cycles: int, start: float = 150.0, drift: float = 0.002, seed: int = 0) -> List[float]:
+    return [start * (1 + drift) ** i for i in range(cycles)]
+
+
+def sideways_prices(cycles: int, start: float = 150.0, amplitude: float = 0.02, period: int = 48, seed: int = 0) -> List[float]:
+    return [start * (1 + amplitude * math.sin(2 * math.pi * i / period)) for i in range(cycles)]
+
+
+SCENARIOS = {
+    "random_walk": random_walk_prices,
+    "trend": trend_prices,
+    "sideways": sideways_prices,
+}
+
+
+@dataclass
+class SimulationReport:
+    cycles: int
+    simulated_seconds: float
+    wall_seconds: float
+    speedup: float
+    cycle_p50_ms: float
+    cycle_p95_ms: float
+    cycle_max_ms: float
+    positions_opened: int
+    positions_closed: int
+    notifications: int
+    final_status: Dict[str, Any] = field(default_factory=dict)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Simulation:
+    """Swaps server.py's clients for fakes for the duration of a ``with``
+    block, or an ``async with`` block inside a running event loop"""
+
+    def __init__(
+        self,
+        prices: List[float],
+        sol_balance: float = 10.0,
+        usdc_balance: float = 1500.0,
+        check_interval: int = 300,
+        rpc_latency: float = 0.0,
+        price_latency: float = 0.0,
+        mongo_url: Optional[str] = None,
+        seed: int = 0,
+    ):
+        self.seed = seed
+        self.check_interval = check_interval
+        self.clock = VirtualClock()
+        self.price_feed = ScriptedPriceFeed(prices, price_latency)
+        self.wallet = SimulatedWallet(usdc_balance, seed)
+        self.rpc = StubRpcClient({str(self.wallet.public_key): int(sol_balance * 1e9)}, rpc_latency)
+        self.discord = DiscordSink()
+        self.jupiter = StubJupiter(self.price_feed)
+        self.mongo_url = mongo_url if mongo_url is not None else os.environ.get('SIM_MONGO_URL')
+        self._saved: Dict[str, Any] = {}
+
+    def _make_db(self):
+        db_name = f"simulation_{self.seed}"
+        if self.mongo_url:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self.mongo_client = AsyncIOMotorClient(self.mongo_url)
+        else:
+            from mongomock_motor import AsyncMongoMockClient
+            self.mongo_client = AsyncMongoMockClient()
+        return self.mongo_client[db_name]
+
+    def __enter__(self) -> "Simulation":
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # __exit__ could not await closing the HTTP client
+            raise RuntimeError("Use 'async with Simulation(...)' inside a running event loop")
+        return self._patch()
+
+    async def __aenter__(self) -> "Simulation":
+        return self._patch()
+
+    def _patch(self) -> "Simulation":
+        self.db = self._make_db()
+        self.http_client = httpx.AsyncClient(transport=self.jupiter.transport)
+        rng = random.Random(self.seed)
+        # The fake database starts empty, so an empty buffer is already complete
+        recent_logs = RecentLogBuffer(server.recent_logs.capacity)
+        recent_logs.prime([])
+        fakes = {
+            "deps": server.Dependencies(
+                db=self.db,
+                solana_client=self.rpc,
+                wallet_manager=self.wallet,
+                http_client=self.http_client,
+            ),
+            "rebalance_planner": RebalancePlanner(
+                JupiterQuoteClient(lambda: server.deps.http_client, clock=self.clock.time),
+                min_swap_value=server.get_rebalance_planner().min_swap_value,
+            ),
+            "recent_logs": recent_logs,
+            "price_monitor": self.price_feed,
+            "discord_notifier": self.discord,
+            "datetime": self.clock.datetime_class(),
+            "time": SimpleNamespace(time=self.clock.time),
+            "uuid": SimpleNamespace(uuid4=lambda: uuid.UUID(int=rng.getrandbits(128), version=4)),
+        }
+        for name, fake in fakes.items():
+            self._saved[name] = getattr(server, name)
+            setattr(server, name, fake)
+        self._saved_env = {key: os.environ.get(key) for key in ('MIN_SOL_AMOUNT', 'MIN_USDC_AMOUNT')}
+        os.environ['MIN_SOL_AMOUNT'] = '0.01'
+        os.environ['MIN_USDC_AMOUNT'] = '1.0'
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run(self.http_client.aclose())
+        self._restore()
+
+    async def __aexit__(self, *exc):
+        await self.http_client.aclose()
+        self._restore()
+
+    def _restore(self):
+        for name, original in self._saved.items():
+            setattr(server, name, original)
+        self._saved.clear()
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if self.mongo_url:
+            self.mongo_client.close()
+
+    async def run(self, cycles: Optional[int] = None) -> SimulationReport:
+        cycles = cycles or len(self.price_feed.prices)
+        durations = []
+        wall_start = time.perf_counter()
+        for _ in range(cycles):
+            cycle_start = time.perf_counter()
+            await server.bot_cycle()
+            durations.append((time.perf_counter() - cycle_start) * 1000)
+            self.clock.advance(self.check_interval)
+            self.price_feed.advance()
+        wall_seconds = time.perf_counter() - wall_start
+
+        positions = self.db.liquidity_positions
+        status = await self.db.bot_status.find_one({}, {"_id": 0}) or {}
+        simulated_seconds = cycles * self.check_interval
+        return SimulationReport(
+            cycles=cycles,
+            simulated_seconds=simulated_seconds,
+            wall_seconds=wall_seconds,
+            speedup=simulated_seconds / wall_seconds if wall_seconds else float("inf"),
+            cycle_p50_ms=percentile(durations, 50),
+            cycle_p95_ms=percentile(durations, 95),
+            cycle_max_ms=max(durations, default=0.0),
+            positions_opened=await positions.count_documents({}),
+            positions_closed=await positions.count_documents({"status": "closed"}),
+            notifications=len(self.discord.messages),
+            final_status=status,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a price scenario through bot_cycle offline")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="random_walk")
+    parser.add_argument("--cycles", type=int, default=288)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-price", type=float, default=150.0)
+    parser.add_argument("--interval", type=int, default=300, help="Simulated seconds between cycles")
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="Real seconds of latency per stub RPC call")
+    args = parser.parse_args(argv)
+
+    prices = SCENARIOS[args.scenario](args.cycles, start=args.start_price, seed=args.seed)
+    with Simulation(prices, check_interval=args.interval, rpc_latency=args.rpc_latency, seed=args.seed) as sim:
+        report = asyncio.run(sim.run())
+    print(json.dumps(asdict(report), indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
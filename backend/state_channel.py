@@ -0,0 +1,142 @@
+import json
+import struct
+import time
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Optional
+
+# Segment layout: sequence (u64) | generation (u64) | payload length (u32) | run requested (u8) | JSON payload
+HEADER = struct.Struct("<QQIB")
+SEQ_OFFSET = 0
+GENERATION_OFFSET = 8
+LENGTH_OFFSET = 16
+CONTROL_OFFSET = 20
+PAYLOAD_OFFSET = HEADER.size
+
+DEFAULT_CHANNEL_NAME = "liquidity_bot_state"
+DEFAULT_CHANNEL_SIZE = 1024 * 1024
+# Newest positions and logs included in each snapshot
+SNAPSHOT_ROWS = 100
+
+
+class StateChannelUnavailable(Exception):
+    pass
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class StateChannel:
+    """Single-writer, many-reader state snapshot kept in shared memory.
+
+    The bot worker owns the segment and publishes JSON snapshots guarded by a
+    sequence counter (odd while a write is in progress), so API processes can
+    read a consistent copy without locks. The control byte travels the other
+    way and carries start/stop requests from the API to the worker.
+
+    Every segment a worker creates gets a new generation, and the worker
+    zeroes it on exit, so readers can tell when they must re-attach.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._seq = struct.unpack_from("<Q", shm.buf, SEQ_OFFSET)[0]
+        self.generation = struct.unpack_from("<Q", shm.buf, GENERATION_OFFSET)[0]
+
+    @classmethod
+    def create(cls, name: str = DEFAULT_CHANNEL_NAME, size: int = DEFAULT_CHANNEL_SIZE) -> "StateChannel":
+        try:
+            # Clean up a segment left behind by a worker that did not exit cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, 0, time.time_ns(), 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_CHANNEL_NAME) -> "StateChannel":
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            raise StateChannelUnavailable(f"State channel '{name}' does not exist - is the bot worker running?")
+        # Readers must not unlink the worker's segment when they exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def retired(self) -> bool:
+        """True once the owning worker has closed this segment"""
+        return struct.unpack_from("<Q", self._shm.buf, GENERATION_OFFSET)[0] != self.generation
+
+    def reattach(self, name: str = DEFAULT_CHANNEL_NAME) -> "StateChannel":
+        """The channel currently published under ``name``: this one, or a new
+        attachment if a restarted worker replaced the segment. Closes this
+        channel unless it is returned."""
+        try:
+            current = StateChannel.attach(name)
+        except StateChannelUnavailable:
+            self.close()
+            raise
+        if current.generation == self.generation:
+            current.close()
+            return self
+        self.close()
+        return current
+
+    @property
+    def capacity(self) -> int:
+        return self._shm.size - PAYLOAD_OFFSET
+
+    def publish(self, state: Dict[str, Any]) -> int:
+        """Write a new snapshot; only the owning worker may call this"""
+        payload = json.dumps(state, default=_json_default, separators=(",", ":")).encode()
+        if len(payload) > self.capacity:
+            raise ValueError(f"State snapshot of {len(payload)} bytes exceeds channel capacity of {self.capacity} bytes")
+
+        buf = self._shm.buf
+        self._seq += 1
+        struct.pack_into("<Q", buf, SEQ_OFFSET, self._seq)
+        buf[PAYLOAD_OFFSET:PAYLOAD_OFFSET + len(payload)] = payload
+        struct.pack_into("<I", buf, LENGTH_OFFSET, len(payload))
+        self._seq += 1
+        struct.pack_into("<Q", buf, SEQ_OFFSET, self._seq)
+        return self._seq
+
+    def read(self, retries: int = 100) -> Optional[Dict[str, Any]]:
+        """Return the latest snapshot, or None if nothing was published yet"""
+        buf = self._shm.buf
+        for _ in range(retries):
+            seq_before = struct.unpack_from("<Q", buf, SEQ_OFFSET)[0]
+            if seq_before == 0:
+                return None
+            if seq_before % 2:
+                time.sleep(0)
+                continue
+            length = struct.unpack_from("<I", buf, LENGTH_OFFSET)[0]
+            payload = bytes(buf[PAYLOAD_OFFSET:PAYLOAD_OFFSET + length])
+            if struct.unpack_from("<Q", buf, SEQ_OFFSET)[0] == seq_before:
+                return json.loads(payload)
+        raise StateChannelUnavailable("Timed out waiting for a consistent state snapshot")
+
+    def request_running(self, running: bool):
+        struct.pack_into("<B", self._shm.buf, CONTROL_OFFSET, 1 if running else 0)
+
+    def running_requested(self) -> bool:
+        return bool(struct.unpack_from("<B", self._shm.buf, CONTROL_OFFSET)[0])
+
+    def close(self):
+        if self._owner and self._shm.buf is not None:
+            struct.pack_into("<Q", self._shm.buf, GENERATION_OFFSET, 0)
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
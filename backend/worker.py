@@ -0,0 +1,153 @@
+"""Standalone bot worker.
+
+Runs the trading loop in its own process and publishes a state snapshot
+through the shared-memory state channel after every cycle and refresh.
+Start it next to the API with ``BOT_MODE=worker``:
+
+    python worker.py
+    BOT_MODE=worker uvicorn server:app --workers 4
+"""
+import asyncio
+import logging
+import os
+import signal
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from server import (
+    BotStatus,
+    STATE_CHANNEL_NAME,
+    bot_cycle,
+    deps,
+    discord_notifier,
+    liquidity_manager,
+    price_monitor,
+    recent_logs,
+    start_log_compaction,
+    start_loop_watchdog,
+)
+from state_channel import DEFAULT_CHANNEL_SIZE, SNAPSHOT_ROWS, StateChannel
+
+logger = logging.getLogger("worker")
+
+
+async def collect_state(running: bool, status: Optional[BotStatus] = None) -> Dict[str, Any]:
+    """Build the snapshot the API processes serve instead of querying Mongo/RPC"""
+    db = deps.db
+    wallet_manager = deps.wallet_manager
+    positions_query = db.liquidity_positions.find({}, {"_id": 0}).sort("created_at", -1).limit(SNAPSHOT_ROWS).to_list(SNAPSHOT_ROWS)
+    # Published in full, apart from the capped history: the dashboard polls them
+    active_query = db.liquidity_positions.find({"status": "active"}, {"_id": 0}).sort("created_at", -1).to_list(None)
+    recent = recent_logs.recent(limit=SNAPSHOT_ROWS)
+    if recent is None:
+        logs_query = db.bot_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(SNAPSHOT_ROWS).to_list(SNAPSHOT_ROWS)
+    else:
+        logs_query = asyncio.sleep(0, result=recent)
+
+    if status is None:
+        sol_price, sol_balance, usdc_balance, status_doc, positions, active_positions, logs = await asyncio.gather(
+            price_monitor.get_sol_price(),
+            wallet_manager.get_sol_balance(),
+            wallet_manager.get_usdc_balance(),
+            db.bot_status.find_one({}, {"_id": 0}),
+            positions_query,
+            active_query,
+            logs_query,
+        )
+        status = BotStatus(**status_doc) if status_doc else BotStatus(is_running=running)
+        status.is_running = running
+    else:
+        sol_price, sol_balance, usdc_balance = status.sol_price, status.current_sol_balance, status.current_usdc_balance
+        positions, active_positions, logs = await asyncio.gather(positions_query, active_query, logs_query)
+
+    now = datetime.now(timezone.utc)
+    return {
+        "status": status.dict(),
+        "wallet": {
+            "public_key": str(wallet_manager.public_key) if wallet_manager.public_key else None,
+            "sol_balance": sol_balance,
+            "usdc_balance": usdc_balance,
+            "configured": wallet_manager.keypair is not None,
+        },
+        "price": {"sol_price": sol_price, "timestamp": now},
+        "positions": positions,
+        "active_positions": active_positions,
+        "logs": logs,
+        "worker": {"pid": os.getpid(), "is_running": running, "published_at": now},
+    }
+
+
+async def run_worker(channel: StateChannel, stop_event: asyncio.Event):
+    check_interval = int(os.environ.get('CHECK_INTERVAL_SECONDS', '300'))
+    refresh_interval = float(os.environ.get('STATE_REFRESH_SECONDS', '15'))
+    poll_interval = float(os.environ.get('CONTROL_POLL_SECONDS', '0.5'))
+    loop = asyncio.get_running_loop()
+
+    running = False
+    next_cycle = 0.0
+    next_refresh = 0.0
+    next_warm_up = 0.0
+
+    while not stop_event.is_set():
+        if not deps.ready and loop.time() >= next_warm_up:
+            # Primes the recent-log buffer and creates the log and price
+            # history indexes, so keep retrying until Mongo and RPC are up
+            if not await deps.warm_up(clients=True):
+                logger.warning(f"Bot worker dependencies not ready, retrying in {refresh_interval:g}s: {deps.checks}")
+            next_warm_up = loop.time() + refresh_interval
+
+        requested = channel.running_requested()
+        if requested != running:
+            running = requested
+            next_cycle = next_refresh = 0.0
+            if running:
+                await discord_notifier.send_notification("🚀 Liquidity bot started!")
+                await liquidity_manager.log_action("INFO", "Bot started")
+            else:
+                await discord_notifier.send_notification("⏹️ Liquidity bot stopped")
+                await liquidity_manager.log_action("INFO", "Bot stopped")
+
+        try:
+            now = loop.time()
+            if running and now >= next_cycle:
+                status = await bot_cycle()
+                next_cycle = now + check_interval
+                channel.publish(await collect_state(running, status))
+                next_refresh = loop.time() + refresh_interval
+            elif now >= next_refresh:
+                channel.publish(await collect_state(running))
+                next_refresh = loop.time() + refresh_interval
+        except Exception as e:
+            logger.error(f"Error publishing worker state: {e}")
+            next_refresh = loop.time() + refresh_interval
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main():
+    size = int(os.environ.get('STATE_CHANNEL_SIZE', str(DEFAULT_CHANNEL_SIZE)))
+    channel = StateChannel.create(STATE_CHANNEL_NAME, size)
+    stop_event = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    logger.info(f"Bot worker {os.getpid()} publishing state on '{STATE_CHANNEL_NAME}'")
+    compaction = start_log_compaction()
+    watchdog = start_loop_watchdog()
+    try:
+        await run_worker(channel, stop_event)
+    finally:
+        compaction.cancel()
+        if watchdog:
+            watchdog.stop()
+        channel.close()
+        await deps.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,23 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend is run from its own directory (uvicorn server:app), so its
+# modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: wall-clock limits, only run with RUN_PERF_TESTS=1 on a dedicated runner")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timing limits fail at random on loaded shared CI runners
+    if os.environ.get("RUN_PERF_TESTS"):
+        return
+    skip = pytest.mark.skip(reason="set RUN_PERF_TESTS=1 to run wall-clock checks")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,35 @@
+import asyncio
+from types import SimpleNamespace
+
+from benchmark import ENDPOINTS, compare_results, run_in_process
+
+
+def result(rps, p95, errors=0):
+    return {"requests": 100, "errors": errors, "throughput_rps": rps, "p50_ms": p95 / 2, "p95_ms": p95, "p99_ms": p95 * 1.5}
+
+
+def test_in_process_suite_covers_every_endpoint():
+    args = SimpleNamespace(
+        endpoints=ENDPOINTS, concurrency=[1, 4], requests=20, upstream_latency=1.0, seed_cycles=50, seed=1
+    )
+    results = asyncio.run(run_in_process(args))
+
+    assert set(results) == set(ENDPOINTS)
+    for levels in results.values():
+        assert set(levels) == {"1", "4"}
+        for measured in levels.values():
+            assert measured["requests"] == 20
+            assert measured["errors"] == 0
+            assert measured["p50_ms"] <= measured["p95_ms"] <= measured["p99_ms"]
+
+
+def test_compare_flags_only_changes_beyond_threshold():
+    baseline = {"results": {"/api/logs": {"8": result(1000, 10.0)}, "/api/price": {"8": result(1000, 10.0)}}}
+    current = {"results": {"/api/logs": {"8": result(700, 13.0, errors=2)}, "/api/price": {"8": result(900, 11.0)}}}
+
+    regressions = compare_results(baseline, current, threshold=0.2)
+
+    assert any("/api/logs @ 8 clients: p95_ms" in r for r in regressions)
+    assert any("/api/logs @ 8 clients: throughput_rps" in r for r in regressions)
+    assert any("/api/logs @ 8 clients: errors" in r for r in regressions)
+    assert not any("/api/price" in r for r in regressions)
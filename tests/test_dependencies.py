@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import server
+from simulation import Simulation
+
+BACKEND_DIR = Path(server.__file__).resolve().parent
+
+
+def test_import_needs_no_mongo_or_clients():
+    env = {k: v for k, v in os.environ.items() if k not in ("MONGO_URL", "DB_NAME")}
+    script = (
+        "import dotenv; dotenv.load_dotenv = lambda *args, **kwargs: False\n"
+        "import server\n"
+        "deps = server.deps\n"
+        "print(deps._db is None, deps._solana_client is None, deps._http_client is None, deps._wallet_manager is None)\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["True", "True", "True", "True"]
+
+
+def test_missing_mongo_url_is_reported_not_raised_at_import(monkeypatch):
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    monkeypatch.setattr(server, "deps", server.Dependencies())
+
+    with TestClient(server.app) as client:
+        response = client.get("/api/health/ready")
+
+    assert response.status_code == 503
+    assert "MONGO_URL" in response.json()["checks"]["mongo"]
+
+
+def test_ready_once_clients_warm_up():
+    with Simulation([150.0]) as sim, TestClient(server.app) as client:
+        response = client.get("/api/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["checks"] == {"wallet": "configured", "config": "ok", "mongo": "ok", "solana_rpc": "ok"}
+        assert sim.rpc.calls["getHealth"] == 1
+
+
+def test_readiness_reports_an_outage_after_warm_up(monkeypatch):
+    monkeypatch.setenv("READY_CACHE_SECONDS", "0")
+
+    async def unreachable():
+        return False
+
+    with Simulation([150.0]) as sim, TestClient(server.app) as client:
+        assert client.get("/api/health/ready").status_code == 200
+        monkeypatch.setattr(sim.rpc, "is_connected", unreachable)
+        response = client.get("/api/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["solana_rpc"] == "error: RPC node unreachable"
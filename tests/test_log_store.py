@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from log_store import RecentLogBuffer, compact_logs
+from simulation import Simulation
+
+
+def log(i, level="INFO", timestamp=None):
+    return {"id": f"log-{i}", "level": level, "message": f"message {i}", "details": None,
+            "timestamp": timestamp or datetime(2024, 1, 1) + timedelta(minutes=i)}
+
+
+def test_unprimed_buffer_defers_to_mongo():
+    buffer = RecentLogBuffer(10)
+    buffer.append(log(1))
+
+    assert buffer.recent() is None
+
+
+def test_prime_keeps_logs_appended_during_the_query():
+    buffer = RecentLogBuffer(5)
+    buffer.append(log(9))
+    buffer.prime([log(8), log(7), log(9)])
+
+    assert [doc["id"] for doc in buffer.recent(limit=5)] == ["log-9", "log-8", "log-7"]
+    assert buffer.complete
+
+
+def test_filtered_query_falls_back_once_history_was_evicted():
+    buffer = RecentLogBuffer(3)
+    buffer.prime([])
+    for i, level in enumerate(["ERROR", "INFO", "INFO", "INFO"]):
+        buffer.append(log(i, level))
+
+    assert [doc["id"] for doc in buffer.recent(limit=2)] == ["log-3", "log-2"]
+    assert buffer.recent(level="ERROR", limit=1) is None
+    assert buffer.recent(limit=4) is None
+
+
+def test_compaction_summarizes_whole_hours_past_retention():
+    db = AsyncMongoMockClient()["compaction"]
+    now = datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc)
+    old = datetime(2024, 1, 1, 5)
+    docs = [log(i, "ERROR" if i % 3 == 0 else "INFO", old + timedelta(minutes=i * 10)) for i in range(12)]
+    docs.append(log(99, timestamp=datetime(2024, 1, 10, 12)))
+
+    async def run():
+        await db.bot_logs.insert_many(docs)
+        result = await compact_logs(db, retention_days=7, summary_retention_days=365, now=now)
+        summaries = await db.bot_log_summaries.find({}, {"_id": 0}).sort("hour", 1).to_list(10)
+        return result, summaries, await db.bot_logs.count_documents({})
+
+    result, summaries, remaining = asyncio.run(run())
+
+    assert result == {"hours_summarized": 2, "logs_deleted": 12, "summaries_deleted": 0}
+    assert remaining == 1
+    assert [s["count"] for s in summaries] == [6, 6]
+    assert summaries[0]["levels"] == {"ERROR": 2, "INFO": 4}
+    assert summaries[0]["errors"] == ["message 0", "message 3"]
+
+
+def test_recent_logs_are_served_without_mongo(monkeypatch):
+    with Simulation([150.0] * 5) as sim:
+        asyncio.run(sim.run())
+        # Any Mongo access from here on raises ConfigurationError
+        monkeypatch.delenv("MONGO_URL", raising=False)
+        monkeypatch.setattr(server, "deps", server.Dependencies())
+
+        response = TestClient(server.app).get("/api/logs?limit=1")
+
+    assert response.status_code == 200
+    assert response.json()[0]["message"].startswith("💰 New position created")
+
+
+def test_compaction_rerun_after_failed_delete_does_not_double_count():
+    db = AsyncMongoMockClient()["compaction_rerun"]
+    now = datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc)
+    docs = [log(i, timestamp=datetime(2024, 1, 1, 5) + timedelta(minutes=i * 10)) for i in range(6)]
+
+    async def run():
+        await db.bot_logs.insert_many([dict(doc) for doc in docs])
+        await compact_logs(db, retention_days=7, summary_retention_days=365, now=now)
+        # As if the process died after writing the summary but before deleting
+        await db.bot_logs.insert_many([dict(doc) for doc in docs])
+        await compact_logs(db, retention_days=7, summary_retention_days=365, now=now)
+        return await db.bot_log_summaries.find({}, {"_id": 0}).to_list(10)
+
+    summaries = asyncio.run(run())
+
+    assert [s["count"] for s in summaries] == [6]
+    assert summaries[0]["levels"] == {"INFO": 6}
+
+
+def test_worker_retries_warm_up_until_dependencies_are_ready(monkeypatch):
+    import worker
+
+    class FlakyDeps:
+        ready = False
+        attempts = 0
+        checks = {}
+
+        async def warm_up(self, clients=None):
+            self.attempts += 1
+            self.ready = self.attempts >= 3
+            return self.ready
+
+    class Channel:
+        def running_requested(self):
+            return False
+
+        def publish(self, state):
+            pass
+
+    async def collect_state(running, status=None):
+        return {}
+
+    flaky = FlakyDeps()
+    monkeypatch.setattr(worker, "deps", flaky)
+    monkeypatch.setattr(worker, "collect_state", collect_state)
+    monkeypatch.setenv("STATE_REFRESH_SECONDS", "0.02")
+    monkeypatch.setenv("CONTROL_POLL_SECONDS", "0.01")
+
+    async def run():
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.3, stop.set)
+        await worker.run_worker(Channel(), stop)
+
+    asyncio.run(run())
+
+    assert flaky.ready and flaky.attempts == 3
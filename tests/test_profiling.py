@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+
+from fastapi.testclient import TestClient
+
+import server
+from profiling import LoopWatchdog, Profiler
+from simulation import Simulation
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_session_collects_collapsed_stacks():
+    async def run():
+        profiler = Profiler()
+        session = profiler.start("sample", seconds=0.3, interval_ms=2)
+        busy(0.2)
+        await asyncio.sleep(0.2)
+        return session
+
+    session = asyncio.run(run())
+
+    assert not session.running and session.samples > 0
+    lines = session.collapsed().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.split(";")[-1].startswith("busy (test_profiling.py")
+    assert int(count) == max(session.stacks.values())
+
+
+def test_cprofile_session_stops_after_requested_cycles():
+    async def run(sim):
+        session = server.profiler.start("cprofile", cycles=2)
+        await sim.run(4)
+        return session
+
+    with Simulation([150.0, 151.0, 152.0, 153.0]) as sim:
+        session = asyncio.run(run(sim))
+
+    assert not session.running
+    assert session.cycles_profiled == 2
+    assert any("fetch_sol_price" in stack for stack in session.stacks)
+
+
+def test_watchdog_logs_stack_of_blocking_callback(caplog):
+    async def run():
+        watchdog = LoopWatchdog(threshold_ms=50).start()
+        await asyncio.sleep(0.05)
+        busy(0.3)
+        await asyncio.sleep(0.05)
+        watchdog.stop()
+        return watchdog
+
+    with caplog.at_level(logging.WARNING, logger="profiling"):
+        watchdog = asyncio.run(run())
+
+    assert watchdog.blocks == 1
+    assert "Event loop blocked" in caplog.text and "in busy" in caplog.text
+
+
+def test_admin_profile_endpoints(monkeypatch):
+    monkeypatch.setattr(server, "profiler", Profiler())
+    client = TestClient(server.app)
+
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.post("/api/admin/profile").status_code == 403
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert client.post("/api/admin/profile", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+    headers = {"X-Admin-Token": "secret"}
+    assert client.post("/api/admin/profile?seconds=3600", headers=headers).status_code == 400
+    started = client.post("/api/admin/profile?seconds=30", headers=headers).json()
+    assert started["state"] == "running"
+    assert client.post("/api/admin/profile", headers=headers).status_code == 409
+    assert client.get("/api/admin/profile/stacks", headers=headers).status_code == 409
+
+    stopped = client.post("/api/admin/profile/stop", headers=headers).json()
+    response = client.get("/api/admin/profile/stacks", headers=headers)
+
+    assert stopped["id"] == started["id"] and stopped["state"] == "finished"
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f"profile-{started['id']}.folded" in response.headers["content-disposition"]
+
+
+def test_cycle_sessions_get_a_window_that_fits_their_cycles():
+    async def run():
+        profiler = Profiler(max_seconds=300, max_cycles=5)
+        session = profiler.start("sample", cycles=3, cycle_seconds=300)
+        profiler.stop()
+        errors = []
+        for kwargs in ({"cycles": 3, "seconds": 900, "cycle_seconds": 600}, {"cycles": 6}, {"seconds": 301}):
+            try:
+                profiler.start("sample", **kwargs)
+            except ValueError as e:
+                errors.append(str(e))
+        return session, errors
+
+    session, errors = asyncio.run(run())
+
+    assert session.seconds == 4 * 300
+    assert len(errors) == 3 and "need at least 1800s" in errors[0]
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+from rebalance import SOL_MINT, USDC_MINT, JupiterQuoteClient, QuoteUnavailable, RebalancePlanner, target_amounts
+from simulation import ScriptedPriceFeed, Simulation, StubJupiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_planner(price=150.0, fee_bps=25):
+    jupiter = StubJupiter(ScriptedPriceFeed([price]), fee_bps=fee_bps)
+    clock = Clock()
+    http_client = httpx.AsyncClient(transport=jupiter.transport)
+    planner = RebalancePlanner(JupiterQuoteClient(lambda: http_client, cache_ttl=5, clock=clock))
+    return planner, jupiter, clock
+
+
+def test_target_ratio_follows_range_position():
+    sol, usdc = target_amounts(3000.0, 150.0, 146.25, 153.75)
+    assert sol * 150.0 == pytest.approx(usdc, rel=0.05)
+    assert sol * 150.0 + usdc == pytest.approx(3000.0)
+
+    assert target_amounts(3000.0, 160.0, 146.25, 153.75) == (0.0, pytest.approx(3000.0))
+
+
+def test_plan_swaps_single_sided_wallet_into_the_range_ratio():
+    planner, jupiter, _ = make_planner()
+    plan = asyncio.run(planner.plan(10.0, 0.0, 150.0, 146.25, 153.75))
+
+    assert plan.swap.input_mint == SOL_MINT and plan.swap.output_mint == USDC_MINT
+    assert plan.swap.route == ["Raydium CLMM"]
+    assert plan.sol_amount * 150.0 == pytest.approx(plan.usdc_amount, rel=0.05)
+    # Only the swap fee is lost; nothing meaningful is left idle
+    assert plan.sol_amount * 150.0 + plan.usdc_amount == pytest.approx(1500.0, rel=0.003)
+    assert plan.leftover_sol * 150.0 + plan.leftover_usdc < 2.0
+    assert jupiter.requests == 1
+
+
+def test_balanced_wallet_needs_no_swap():
+    planner, jupiter, _ = make_planner()
+    sol, usdc = target_amounts(1500.0, 150.0, 146.25, 153.75)
+    plan = asyncio.run(planner.plan(sol, usdc, 150.0, 146.25, 153.75))
+
+    assert plan.swap is None
+    assert jupiter.requests == 0
+
+
+def test_min_swap_value_must_be_positive():
+    with pytest.raises(ValueError, match="positive"):
+        RebalancePlanner(JupiterQuoteClient(lambda: None), min_swap_value=0)
+
+
+def test_bad_min_swap_falls_back_without_aborting_the_cycle(monkeypatch):
+    with Simulation([150.0] * 2, sol_balance=10.0, usdc_balance=100.0) as sim:
+        monkeypatch.setenv("MIN_SWAP_USD", "0")
+        # Simulation.__exit__ restores the original planner
+        server.rebalance_planner = None
+        asyncio.run(sim.run())
+        position = asyncio.run(sim.db.liquidity_positions.find_one({}))
+        warning = asyncio.run(sim.db.bot_logs.find_one({"level": "WARNING"}))
+
+    assert position is not None
+    assert "min_swap_value must be positive" in warning["message"]
+    assert sim.jupiter.requests == 0
+
+
+def test_quotes_are_cached_per_size_bucket():
+    planner, jupiter, clock = make_planner()
+    client = planner.quote_client
+
+    async def quotes():
+        # Buckets are 5% wide: 1.05**34 = 5.25 .. 1.05**35 = 5.52
+        first = await client.quote(SOL_MINT, USDC_MINT, 5.3)
+        same_bucket = await client.quote(SOL_MINT, USDC_MINT, 5.4)
+        other_bucket = await client.quote(SOL_MINT, USDC_MINT, 8.0)
+        clock.now = 6.0
+        expired = await client.quote(SOL_MINT, USDC_MINT, 5.3)
+        return first, same_bucket, other_bucket, expired
+
+    first, same_bucket, other_bucket, expired = asyncio.run(quotes())
+
+    assert not first.cached and same_bucket.cached and not other_bucket.cached and not expired.cached
+    assert same_bucket.out_amount == pytest.approx(first.out_amount * 5.4 / 5.3)
+    assert jupiter.requests == 3
+
+
+def test_quote_errors_raise_quote_unavailable():
+    failing = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    client = JupiterQuoteClient(lambda: failing)
+
+    with pytest.raises(QuoteUnavailable):
+        asyncio.run(client.quote(SOL_MINT, USDC_MINT, 1.0))
+
+
+def test_bot_swaps_before_opening_position():
+    with Simulation([150.0] * 3, sol_balance=10.0, usdc_balance=100.0) as sim:
+        asyncio.run(sim.run())
+        position = asyncio.run(sim.db.liquidity_positions.find_one({}))
+        swap_log = asyncio.run(sim.db.bot_logs.find_one({"message": {"$regex": "^🔁 Swap"}}))
+
+    assert swap_log is not None
+    assert position["usdc_amount"] > 500
+    assert sim.jupiter.requests == 1
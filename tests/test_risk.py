@@ -0,0 +1,121 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from risk import best_range, bootstrap_sampler, evaluate_ranges, gbm_sampler, make_sampler, parse_range_candidates
+from simulation import Simulation, random_walk_prices
+
+
+def test_wider_ranges_stay_in_range_longer():
+    estimates = evaluate_ranges(150.0, [2, 5, 20, 190], 1000.0, gbm_sampler(0.8, 0.25), n_paths=20_000, seed=1)
+
+    out_of_range = [e.out_of_range_probability for e in estimates]
+    hours = [e.expected_hours_in_range for e in estimates]
+    assert out_of_range == sorted(out_of_range, reverse=True)
+    assert hours == sorted(hours)
+    assert out_of_range[-1] == 0.0 and hours[-1] == 24.0
+    assert (estimates[1].lower_price, estimates[1].upper_price) == (146.25, 153.75)
+
+
+def test_rebalance_cost_favours_wider_ranges():
+    sampler = gbm_sampler(0.8, 0.25)
+    cheap = best_range(evaluate_ranges(150.0, [2, 5, 20], 1000.0, sampler, n_paths=20_000, seed=2))
+    costly = best_range(evaluate_ranges(150.0, [2, 5, 20], 1000.0, sampler, n_paths=20_000, seed=2, rebalance_cost=50))
+
+    assert costly.range_percent > cheap.range_percent
+
+
+def test_bootstrap_needs_enough_history():
+    returns = np.full(200, 0.001)
+
+    assert bootstrap_sampler(returns[:50], history_step_seconds=300, step_hours=0.25) is None
+    sample = bootstrap_sampler(returns, history_step_seconds=300, step_hours=0.25)
+    assert np.allclose(sample(np.random.default_rng(0), 4), 0.003)
+
+
+def test_make_sampler_falls_back_to_default_volatility():
+    start = datetime(2024, 1, 1)
+    prices = [150.0, 151.0, 150.5]
+    sampler = make_sampler(prices, [start + timedelta(minutes=5 * i) for i in range(3)], 0.25, default_volatility=0.8)
+
+    increments = sampler(np.random.default_rng(0), 100_000)
+    assert abs(float(np.std(increments)) - 0.8 * (0.25 / 8760) ** 0.5) < 1e-4
+
+
+def test_make_sampler_drops_returns_across_downtime():
+    start = datetime(2024, 1, 1)
+    prices = [150.0 * (1.001 if i % 2 else 1.0) for i in range(200)] + [210.0 * (1.001 if i % 2 else 1.0) for i in range(200)]
+    timestamps = [start + timedelta(minutes=5 * i) for i in range(200)]
+    timestamps += [start + timedelta(days=2, minutes=5 * i) for i in range(200)]
+    sampler = make_sampler(prices, timestamps, 0.25, default_volatility=0.8)
+
+    increments = sampler(np.random.default_rng(0), 100_000)
+    assert float(np.max(np.abs(increments))) < 0.01
+
+
+def test_range_candidates_outside_0_200_are_rejected():
+    assert parse_range_candidates("2, 5,10") == [2.0, 5.0, 10.0]
+    assert parse_range_candidates("") == []
+    for value in ("0", "5,200", "250", "-1", "5,abc"):
+        with pytest.raises(ValueError):
+            parse_range_candidates(value)
+    with pytest.raises(ValueError):
+        evaluate_ranges(150.0, [5, 200], 1000.0, gbm_sampler(0.8, 0.25), n_paths=10)
+
+
+def test_invalid_range_candidates_are_reported_by_readiness(monkeypatch):
+    monkeypatch.setenv("RISK_RANGE_CANDIDATES", "5,250")
+    # Constructing the manager (as importing server does) must not fail
+    manager = server.LiquidityManager()
+    monkeypatch.setattr(server, "liquidity_manager", manager)
+
+    with pytest.raises(server.ConfigurationError, match="RISK_RANGE_CANDIDATES"):
+        manager.range_candidates
+    with Simulation([150.0]), TestClient(server.app) as client:
+        response = client.get("/api/health/ready")
+
+    assert response.status_code == 503
+    assert "RISK_RANGE_CANDIDATES" in response.json()["checks"]["config"]
+
+
+def test_mock_prices_are_not_recorded():
+    async def unavailable():
+        return None
+
+    with Simulation([150.0] * 5) as sim:
+        asyncio.run(sim.run(3))
+        sim.price_feed.fetch_sol_price = unavailable
+        asyncio.run(sim.run(2))
+        recorded = asyncio.run(sim.db.price_history.distinct("price"))
+        count = asyncio.run(sim.db.price_history.count_documents({}))
+
+    assert count == 3 and recorded == [150.0]
+
+
+@pytest.mark.perf
+def test_100k_paths_fit_in_a_bot_cycle():
+    sampler = gbm_sampler(0.8, 0.25)
+    start = time.perf_counter()
+    evaluate_ranges(150.0, [2, 5, 10, 20], 1000.0, sampler, n_paths=100_000, seed=3)
+
+    assert time.perf_counter() - start < 1.0
+
+
+def test_bot_picks_range_from_candidates(monkeypatch):
+    monkeypatch.setattr(server.liquidity_manager, "_range_candidates", [2.0, 10.0, 30.0])
+    monkeypatch.setenv("RISK_PATHS", "20000")
+    monkeypatch.setenv("RISK_REBALANCE_COST_USD", "100")
+
+    with Simulation(random_walk_prices(120, seed=4)) as sim:
+        asyncio.run(sim.run())
+        position = asyncio.run(sim.db.liquidity_positions.find_one({}, sort=[("created_at", -1)]))
+        choice = asyncio.run(sim.db.bot_logs.find_one({"message": {"$regex": "^🎲"}}))
+
+    width = (position["upper_price"] - position["lower_price"]) / ((position["upper_price"] + position["lower_price"]) / 2)
+    assert round(width * 100) == 30
+    assert [e["range_percent"] for e in choice["details"]["estimates"]] == [2.0, 10.0, 30.0]
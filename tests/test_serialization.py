@@ -0,0 +1,56 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from benchmark import fast_serialize, legacy_serialize
+from serialization import RowSerializer, iter_json_array, iter_ndjson
+from server import BotLog, LiquidityPosition
+
+
+def position_docs(count):
+    closed_at = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+    return [
+        LiquidityPosition(
+            position_id=f"pos_{i}", pool_id="pool", lower_price=95.0, upper_price=105.0,
+            sol_amount=1.0, usdc_amount=100.0, liquidity_amount=200.0, closed_at=closed_at if i % 2 else None,
+        ).dict()
+        for i in range(count)
+    ]
+
+
+def test_fast_path_matches_response_model_output():
+    docs = position_docs(5)
+    legacy = legacy_serialize([dict(d) for d in docs], LiquidityPosition, TypeAdapter(List[LiquidityPosition]))
+    fast = asyncio.run(fast_serialize([dict(d) for d in docs], RowSerializer(LiquidityPosition)))
+
+    assert json.loads(fast) == json.loads(legacy)
+
+
+def test_mongo_id_is_dropped_and_defaults_filled():
+    doc = {"_id": object(), "level": "INFO", "message": "Bot started", "timestamp": datetime(2024, 1, 1)}
+    row = json.loads(RowSerializer(BotLog).dumps(doc))
+
+    assert "_id" not in row
+    assert row["details"] is None
+    assert row["id"]
+
+
+def test_json_array_streams_in_chunks():
+    chunks = asyncio.run(_collect(iter_json_array(position_docs(2000), RowSerializer(LiquidityPosition))))
+
+    assert len(chunks) > 1
+    assert len(json.loads(b"".join(chunks))) == 2000
+
+
+def test_ndjson_emits_one_row_per_line():
+    body = b"".join(asyncio.run(_collect(iter_ndjson(position_docs(3), RowSerializer(LiquidityPosition)))))
+    lines = body.decode().splitlines()
+
+    assert [json.loads(line)["position_id"] for line in lines] == ["pos_0", "pos_1", "pos_2"]
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
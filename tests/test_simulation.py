@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from simulation import Simulation, random_walk_prices, sideways_prices, trend_prices
+
+
+def run_scenario(prices, **kwargs):
+    with Simulation(prices, **kwargs) as sim:
+        return asyncio.run(sim.run()), sim
+
+
+def test_flat_market_keeps_single_position():
+    report, sim = run_scenario([150.0] * 20)
+
+    assert report.positions_opened == 1
+    assert report.positions_closed == 0
+    assert report.final_status["active_positions"] == 1
+    assert sim.price_feed.requests == 20
+
+
+def test_trend_rebalances_when_price_leaves_range():
+    # A 5% range is left after ~13 cycles of 0.2% drift
+    report, sim = run_scenario(trend_prices(40))
+
+    assert report.positions_opened > 1
+    assert report.positions_closed == report.positions_opened - 1
+    assert any("Position closed" in n["message"] for n in sim.discord.messages)
+
+
+def test_virtual_clock_drives_timestamps():
+    report, sim = run_scenario(sideways_prices(12), check_interval=600)
+
+    assert report.simulated_seconds == 12 * 600
+    assert sim.clock.now().isoformat() == "2024-01-01T02:00:00+00:00"
+    assert str(report.final_status["last_check"]).startswith("2024-01-01 01:50:00")
+
+
+def test_http_client_is_closed_on_exit():
+    _, sim = run_scenario([150.0] * 3)
+
+    async def run_async():
+        async with Simulation([150.0] * 3) as async_sim:
+            await async_sim.run()
+        return async_sim
+
+    assert sim.http_client.is_closed
+    assert asyncio.run(run_async()).http_client.is_closed
+
+
+def test_runs_are_deterministic():
+    prices = random_walk_prices(200, seed=11)
+    first, _ = run_scenario(prices, seed=11)
+    second, _ = run_scenario(prices, seed=11)
+
+    assert first.final_status == second.final_status
+    assert (first.positions_opened, first.positions_closed) == (second.positions_opened, second.positions_closed)
+
+
+@pytest.mark.perf
+def test_cycle_throughput_regression():
+    report, _ = run_scenario(random_walk_prices(500, seed=5))
+
+    # ~1.7 simulated days of 5-minute cycles; a generous ceiling that still catches slowdowns
+    assert report.wall_seconds < 5.0
+    assert report.cycle_p95_ms < 50.0
@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+import state_channel
+from simulation import Simulation
+from state_channel import SNAPSHOT_ROWS, StateChannel
+
+
+@pytest.fixture
+def channel_name(monkeypatch):
+    name = f"test_state_{uuid.uuid4().hex[:8]}"
+    monkeypatch.setattr(server, "STATE_CHANNEL_NAME", name)
+    monkeypatch.setattr(server, "state_channel", None)
+    # Worker and reader share this process, so the reader must not drop the
+    # worker's resource-tracker registration
+    monkeypatch.setattr(state_channel.resource_tracker, "unregister", lambda name, rtype: None)
+    yield name
+    if server.state_channel:
+        server.state_channel.close()
+
+
+def snapshot(value, age_seconds=0.0):
+    published_at = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+    return {"v": value, "wallet": {"configured": True}, "worker": {"is_running": True, "published_at": published_at}}
+
+
+def test_reader_follows_a_restarted_worker(channel_name):
+    worker = StateChannel.create(channel_name, 4096)
+    worker.publish(snapshot(1))
+    assert server.get_worker_state()["v"] == 1
+
+    worker.close()
+    restarted = StateChannel.create(channel_name, 4096)
+    restarted.publish(snapshot(2))
+    try:
+        assert server.get_worker_state()["v"] == 2
+        server.worker_channel(verify=True).request_running(True)
+        assert restarted.running_requested()
+    finally:
+        restarted.close()
+
+
+def test_reader_follows_a_worker_replacing_a_crashed_one(channel_name):
+    crashed = StateChannel.create(channel_name, 4096)
+    crashed.publish(snapshot(1, age_seconds=3600))
+    server.worker_channel()
+
+    # The crashed worker never closed its segment; the new one replaces it
+    replacement = StateChannel.create(channel_name, 4096)
+    replacement.publish(snapshot(2))
+    try:
+        assert server.get_worker_state()["v"] == 2
+    finally:
+        replacement.close()
+        crashed._shm.close()
+
+
+def test_stale_snapshot_is_not_served(channel_name, monkeypatch):
+    monkeypatch.setattr(server, "BOT_MODE", "worker")
+    monkeypatch.setattr(server, "deps", server.Dependencies())
+    monkeypatch.setenv("STATE_REFRESH_SECONDS", "15")
+    monkeypatch.setenv("READY_CACHE_SECONDS", "0")
+    worker = StateChannel.create(channel_name, 4096)
+    worker.publish(snapshot(1))
+    try:
+        with TestClient(server.app) as client:
+            assert client.get("/api/health/ready").status_code == 200
+
+            worker.publish(snapshot(1, age_seconds=120))
+            with pytest.raises(HTTPException) as excinfo:
+                server.get_worker_state()
+            response = client.get("/api/health/ready")
+    finally:
+        worker.close()
+
+    assert excinfo.value.status_code == 503 and "stale" in excinfo.value.detail
+    assert response.status_code == 503
+    assert "stale" in response.json()["checks"]["state_channel"]
+
+
+def test_snapshot_defers_filtered_queries_it_cannot_answer():
+    logs = [{"level": "ERROR" if i == 0 else "INFO"} for i in range(SNAPSHOT_ROWS)]
+
+    assert len(server.snapshot_rows(logs, "level", "INFO", 50)) == 50
+    assert server.snapshot_rows(logs, "level", "ERROR", 5) is None
+    assert server.snapshot_rows(logs, "level", None, SNAPSHOT_ROWS + 1) is None
+    # Fewer rows than the cap means the snapshot holds every row
+    assert server.snapshot_rows(logs[:10], "level", "ERROR", 5) == logs[:1]
+
+
+def worker_state(active, closed, wallet_configured=True, age_seconds=0.0):
+    state = snapshot(0, age_seconds)
+    positions = [
+        server.LiquidityPosition(
+            position_id=f"pos-{i}", pool_id="pool", lower_price=145.0, upper_price=155.0, sol_amount=1.0,
+            usdc_amount=150.0, liquidity_amount=300.0, status="active" if i < active else "closed",
+        ).dict()
+        for i in range(active + closed)
+    ]
+    state.update({"positions": positions[:SNAPSHOT_ROWS], "active_positions": positions[:active]})
+    state["wallet"]["configured"] = wallet_configured
+    state["worker"]["is_running"] = False
+    return state
+
+
+def test_worker_mode_serves_dashboard_reads_without_mongo_or_wallet(channel_name, monkeypatch):
+    monkeypatch.setattr(server, "BOT_MODE", "worker")
+    # Any Mongo or wallet access from the API process would fail or be visible here
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    deps = server.Dependencies()
+    monkeypatch.setattr(server, "deps", deps)
+    worker = StateChannel.create(channel_name, 65536)
+    worker.publish(worker_state(active=1, closed=150, wallet_configured=False))
+    try:
+        client = TestClient(server.app)
+        active = client.get("/api/positions?status=active")
+        refused = client.post("/api/start")
+        worker.publish(worker_state(active=1, closed=150))
+        started = client.post("/api/start")
+        requested = worker.running_requested()
+    finally:
+        worker.close()
+
+    assert [p["position_id"] for p in active.json()] == ["pos-0"]
+    assert refused.status_code == 400
+    assert started.json() == {"message": "Bot start requested"} and requested
+    assert deps._db is None and deps._wallet_manager is None
+
+
+def test_worker_publishes_every_active_position(monkeypatch):
+    import worker
+
+    with Simulation([150.0] * 3) as sim:
+        asyncio.run(sim.run())
+        monkeypatch.setattr(worker, "deps", server.deps)
+        monkeypatch.setattr(worker, "recent_logs", server.recent_logs)
+        state = asyncio.run(worker.collect_state(True, server.BotStatus(is_running=True)))
+
+    assert [p["status"] for p in state["active_positions"]] == ["active"]
+    assert state["active_positions"][0] in state["positions"]